@@ -0,0 +1,63 @@
+from typing import List, Tuple
+from datetime import date
+
+import pytest
+
+from src.domain.flight_events.service import FlightEventService
+from src.domain.flight_events.snapshot import write_snapshot
+from src.domain.journeys.service import JourneySearchService
+from .generator import ScheduleSpec, sample_queries, write_schedule
+
+# Busquedas distintas por benchmark: se recorren en ciclo para no medir siempre la misma
+QUERY_COUNT = 100
+
+
+def pytest_addoption(parser):
+    defaults = ScheduleSpec()
+    group = parser.getgroup("schedule", "schedule sintetico de los benchmarks")
+    group.addoption("--bench-cities", type=int, default=defaults.cities)
+    group.addoption("--bench-hubs", type=int, default=defaults.hubs)
+    group.addoption("--bench-flights-per-day", type=int, default=defaults.flights_per_day)
+    group.addoption("--bench-days", type=int, default=defaults.days)
+
+
+@pytest.fixture(scope="session")
+def spec(pytestconfig) -> ScheduleSpec:
+    return ScheduleSpec(
+        cities=pytestconfig.getoption("bench_cities"),
+        hubs=pytestconfig.getoption("bench_hubs"),
+        flights_per_day=pytestconfig.getoption("bench_flights_per_day"),
+        days=pytestconfig.getoption("bench_days"),
+    )
+
+
+@pytest.fixture(scope="session")
+def schedule_path(spec, tmp_path_factory) -> str:
+    path = str(tmp_path_factory.mktemp("schedule") / "flight_events.json")
+    write_schedule(spec, path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def snapshot_path(flight_event_service, tmp_path_factory) -> str:
+    path = str(tmp_path_factory.mktemp("schedule") / "flight_events.bin")
+    write_snapshot(flight_event_service.snapshot(), path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def flight_event_service(schedule_path) -> FlightEventService:
+    service = FlightEventService(data_path=schedule_path)
+    service.load()
+    return service
+
+
+@pytest.fixture(scope="session")
+def search_service(flight_event_service) -> JourneySearchService:
+    # Sin cache ni route table: se mide la busqueda en si
+    return JourneySearchService(flight_event_service)
+
+
+@pytest.fixture(scope="session")
+def queries(spec) -> List[Tuple[date, str, str]]:
+    return sample_queries(spec, QUERY_COUNT)
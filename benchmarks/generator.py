@@ -0,0 +1,161 @@
+"""Generador de schedules sinteticos hub-and-spoke para los benchmarks.
+
+Cada ciudad que no es hub (spoke) opera contra uno o dos hubs, y los hubs estan
+conectados entre si y agrupan sus vuelos en bancos de conexion. Se arma una grilla de vuelos diaria (ruta, horario, duracion)
+que se repite todos los dias con algunas cancelaciones, como un schedule real.
+
+Uso:
+
+    python -m benchmarks.generator data/bench.json --cities 300 --hubs 12 --flights-per-day 4000 --days 14
+"""
+import argparse
+import json
+import random
+from datetime import date, datetime, timedelta
+from itertools import islice, product
+from string import ascii_uppercase
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+MINUTES_PER_DAY = 24 * 60
+
+AIRLINES = ("AR", "LA", "AA", "IB", "BA", "AF", "LH", "KL", "UA", "DL", "CX", "JL")
+
+# Probabilidad de que un vuelo de la grilla no opere un dia dado
+CANCELLATION_RATE = 0.05
+
+# Los hubs operan en bancos: las llegadas se concentran antes de cada banco y las
+# salidas justo despues, asi que la mayoria de los spokes conectan entre si
+BANKS = tuple(range(7 * 60, 23 * 60, 3 * 60))
+
+
+class ScheduleSpec(NamedTuple):
+    cities: int = 150
+    hubs: int = 8
+    flights_per_day: int = 1500
+    days: int = 7
+    start: date = date(2025, 1, 1)
+    seed: int = 42
+
+
+class ScheduledFlight(NamedTuple):
+    flight_number: str
+    from_city: str
+    to_city: str
+    departure: int  # minutos desde medianoche
+    duration: int
+
+
+def city_codes(n: int) -> List[str]:
+    """Codigos IATA ficticios: AAA, AAB, ..."""
+    return ["".join(code) for code in islice(product(ascii_uppercase, repeat=3), n)]
+
+
+def _timetable(spec: ScheduleSpec, rng: random.Random) -> List[ScheduledFlight]:
+    if not 0 < spec.hubs < spec.cities:
+        raise ValueError("hubs must be between 1 and cities - 1")
+
+    cities = city_codes(spec.cities)
+    hubs, spokes = cities[:spec.hubs], cities[spec.hubs:]
+    home_hubs = {
+        spoke: sorted({hubs[i % spec.hubs], hubs[(i * 7 + 3) % spec.hubs]})
+        for i, spoke in enumerate(spokes)
+    }
+
+    durations: Dict[Tuple[str, str], int] = {}
+
+    def duration(a: str, b: str) -> int:
+        # Misma duracion en ambos sentidos de la ruta, entre 1 y 10 hs
+        key = (a, b) if a < b else (b, a)
+        if key not in durations:
+            durations[key] = rng.randrange(60, 600, 5)
+        return durations[key]
+
+    flights = []
+    for i in range(spec.flights_per_day):
+        kind, bank = rng.random(), rng.choice(BANKS)
+        if kind < 0.1 and spec.hubs > 1:
+            from_city, to_city = rng.sample(hubs, 2)
+            departure = bank + rng.randrange(0, 60, 5)
+        elif kind < 0.55:
+            from_city = rng.choice(spokes)
+            to_city = rng.choice(home_hubs[from_city])
+            # Llega al hub entre 30 y 90 minutos antes del banco
+            departure = bank - duration(from_city, to_city) - rng.randrange(30, 90, 5)
+        else:
+            to_city = rng.choice(spokes)
+            from_city = rng.choice(home_hubs[to_city])
+            departure = bank + rng.randrange(0, 60, 5)
+
+        flights.append(ScheduledFlight(
+            flight_number=f"{AIRLINES[i % len(AIRLINES)]}{1000 + i // len(AIRLINES)}",
+            from_city=from_city,
+            to_city=to_city,
+            departure=departure % MINUTES_PER_DAY,
+            duration=duration(from_city, to_city),
+        ))
+    return flights
+
+
+def generate_events(spec: ScheduleSpec = ScheduleSpec()) -> Iterator[dict]:
+    """Eventos en el mismo formato que `flight_events.json`, ordenados por dia."""
+    rng = random.Random(spec.seed)
+    timetable = _timetable(spec, rng)
+
+    for offset in range(spec.days):
+        day = datetime.combine(spec.start + timedelta(days=offset), datetime.min.time())
+        for flight in timetable:
+            if rng.random() < CANCELLATION_RATE:
+                continue
+            departure = day + timedelta(minutes=flight.departure)
+            yield {
+                "event_id": f"{flight.flight_number}-{departure.date().isoformat()}",
+                "flight_number": flight.flight_number,
+                "from": flight.from_city,
+                "to": flight.to_city,
+                "departure_time": departure.isoformat(),
+                "arrival_time": (departure + timedelta(minutes=flight.duration)).isoformat(),
+            }
+
+
+def sample_queries(spec: ScheduleSpec, n: int, seed: int = 0) -> List[Tuple[date, str, str]]:
+    """Busquedas `(fecha, origen, destino)` entre spokes: las que necesitan conexiones via hubs."""
+    rng = random.Random(seed)
+    spokes = city_codes(spec.cities)[spec.hubs:]
+    return [
+        (spec.start + timedelta(days=rng.randrange(spec.days)), *rng.sample(spokes, 2))
+        for _ in range(n)
+    ]
+
+
+def write_schedule(spec: ScheduleSpec, path: str) -> int:
+    """Escribe el schedule como un array JSON (un evento por linea) y devuelve la cantidad de eventos."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for event in generate_events(spec):
+            f.write(",\n" if count else "")
+            f.write(json.dumps(event))
+            count += 1
+        f.write("\n]\n")
+    return count
+
+
+def main() -> None:
+    defaults = ScheduleSpec()
+    parser = argparse.ArgumentParser(description="Genera un schedule sintetico hub-and-spoke")
+    parser.add_argument("path")
+    parser.add_argument("--cities", type=int, default=defaults.cities)
+    parser.add_argument("--hubs", type=int, default=defaults.hubs)
+    parser.add_argument("--flights-per-day", type=int, default=defaults.flights_per_day)
+    parser.add_argument("--days", type=int, default=defaults.days)
+    parser.add_argument("--start", type=date.fromisoformat, default=defaults.start)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    spec = ScheduleSpec(args.cities, args.hubs, args.flights_per_day, args.days, args.start, args.seed)
+    count = write_schedule(spec, args.path)
+    print(f"Wrote {count} flight events to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
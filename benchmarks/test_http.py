@@ -0,0 +1,76 @@
+from itertools import cycle
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("fastapi")
+
+from dependency_injector import providers
+from fastapi.testclient import TestClient
+
+from src.application.app import create_app
+from src.domain.flight_events.service import FlightEventService
+
+
+@pytest.fixture(scope="module")
+def client(schedule_path):
+    app = create_app()
+    # El schedule sintetico reemplaza al de settings; sin cache para medir la busqueda
+    app.state.flight_events_container.service.override(
+        providers.Singleton(FlightEventService, data_path=schedule_path))
+    app.state.journeys_container.cache.override(providers.Object(None))
+
+    with TestClient(app) as client:
+        yield client
+
+
+def test_http_search(benchmark, client, queries):
+    """GET /journeys/search de punta a punta: validacion, busqueda y serializacion."""
+    pending = cycle(queries)
+
+    def search():
+        flight_date, from_city, to_city = next(pending)
+        return client.get("/journeys/search", params={
+            "date": f"{flight_date.isoformat()}T00:00:00",
+            "from_city": from_city,
+            "to_city": to_city,
+            "max_connections": 3,
+        })
+
+    response = benchmark(search)
+    assert response.status_code == 200
+
+
+def test_http_batch_search(benchmark, client, queries):
+    body = {
+        "queries": [
+            {"date": f"{d.isoformat()}T00:00:00", "from_city": a, "to_city": b}
+            for d, a, b in queries
+        ],
+        "max_connections": 3,
+    }
+    response = benchmark(client.post, "/journeys/search/batch", json=body)
+    assert response.status_code == 200
+    assert len(response.json()) == len(queries)
+
+
+@pytest.mark.parametrize("format", ["json", "ndjson"])
+def test_http_list_flight_events(benchmark, client, format):
+    response = benchmark(client.get, "/flight-events", params={"limit": 1000, "format": format})
+    assert response.status_code == 200
+
+
+def test_http_search_not_modified(benchmark, client, queries):
+    """Revalidacion con If-None-Match: el 304 se responde sin buscar ni serializar."""
+    flight_date, from_city, to_city = queries[0]
+    params = {
+        "date": f"{flight_date.isoformat()}T00:00:00",
+        "from_city": from_city,
+        "to_city": to_city,
+        "max_connections": 3,
+    }
+    etag = client.get("/journeys/search", params=params).headers["ETag"]
+
+    response = benchmark(
+        client.get, "/journeys/search", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 304
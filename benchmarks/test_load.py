@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from src.domain.flight_events.service import FlightEventService
+
+
+def test_load_json(benchmark, schedule_path, spec):
+    """Parseo e indexado del schedule completo desde JSON."""
+    store = benchmark(FlightEventService(data_path=schedule_path).load)
+    assert len(store) > spec.flights_per_day * (spec.days - 1)
+
+
+def test_load_snapshot(benchmark, snapshot_path, flight_event_service):
+    """Apertura del snapshot binario con mmap."""
+    store = benchmark(FlightEventService(data_path=snapshot_path).load)
+    assert len(store) == len(flight_event_service.snapshot())
+
+
+def test_list_all(benchmark, flight_event_service):
+    """Materializar todos los eventos del snapshot (listado sin paginar)."""
+    events = benchmark(flight_event_service.list_all)
+    assert len(events) == len(flight_event_service.snapshot())
@@ -0,0 +1,52 @@
+from datetime import timedelta
+from itertools import cycle
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from src.domain.journeys.service import SearchFilters
+
+
+@pytest.mark.parametrize("max_connections", [1, 2, 3])
+def test_single_search(benchmark, search_service, queries, max_connections):
+    """Una busqueda por ronda, rotando entre pares spoke-spoke."""
+    pending = cycle(queries)
+    benchmark(lambda: search_service.search(*next(pending), max_connections=max_connections))
+
+    # El schedule tiene que generar journeys: si no, el benchmark no mide nada util
+    if max_connections == 3:
+        assert any(search_service.search(*q, max_connections=3) for q in queries)
+
+
+def test_top_k_search(benchmark, search_service, queries):
+    """Solo los 5 mejores journeys de cada busqueda."""
+    pending = cycle(queries)
+    filters = SearchFilters(limit=5)
+    benchmark(lambda: search_service.search(*next(pending), max_connections=3, filters=filters))
+
+
+def test_pareto_search(benchmark, search_service, queries):
+    pending = cycle(queries)
+    filters = SearchFilters(pareto=True)
+    benchmark(lambda: search_service.search(*next(pending), max_connections=3, filters=filters))
+
+
+def test_batch_search(benchmark, search_service, queries):
+    """Todas las busquedas de muestra en un solo batch."""
+    results = benchmark(search_service.search_batch, queries, max_connections=3)
+    assert len(results) == len(queries)
+
+
+def test_range_search(benchmark, search_service, queries, spec):
+    """Todos los dias del schedule para un mismo par de ciudades."""
+    pending = cycle(queries)
+    date_to = spec.start + timedelta(days=spec.days - 1)
+
+    def search_range():
+        _, from_city, to_city = next(pending)
+        return search_service.search_range(
+            spec.start, date_to, from_city, to_city, max_connections=3)
+
+    days = benchmark(search_range)
+    assert len(days) == spec.days
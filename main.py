@@ -1,7 +1,14 @@
-import uvicorn
-import logging.config
-from src.application.app import create_app
-from src.infrastructure.config.settings import settings
+from time import perf_counter
+
+_start = perf_counter()
+
+import uvicorn  # noqa: E402
+import logging.config  # noqa: E402
+from src.application.app import create_app  # noqa: E402
+from src.infrastructure.config.settings import settings  # noqa: E402
+from src.infrastructure.metrics.profiling import STAGE_SECONDS  # noqa: E402
+
+_imported = perf_counter()
 
 logging.config.dictConfig(settings.get_logging_config())
 logger = logging.getLogger(__name__)
@@ -9,14 +16,34 @@ logger = logging.getLogger(__name__)
 
 app = create_app()
 
+# Tiempos de arranque: se loguean y quedan en /metrics como etapas "import" y "wiring"
+_wired = perf_counter()
+STAGE_SECONDS.labels("import").observe(_imported - _start)
+STAGE_SECONDS.labels("wiring").observe(_wired - _imported)
+logger.info(
+    f"Imports took {(_imported - _start) * 1000:.0f}ms, "
+    f"app wiring took {(_wired - _imported) * 1000:.0f}ms"
+)
+
 if __name__ == "__main__":
     logger.info(f"Starting {settings.app_name} in {settings.environment} mode")
 
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=settings.is_development,
-        log_level=settings.log_level.lower(),
-        workers=1,
-    )
+    if settings.server_workers > 1 and not settings.is_development:
+        from src.application.prefork import serve_prefork
+
+        serve_prefork(
+            app,
+            host=settings.server_host,
+            port=settings.server_port,
+            workers=settings.server_workers,
+            log_level=settings.log_level.lower(),
+        )
+    else:
+        uvicorn.run(
+            "main:app",
+            host=settings.server_host,
+            port=settings.server_port,
+            reload=settings.is_development,
+            log_level=settings.log_level.lower(),
+            workers=1,
+        )
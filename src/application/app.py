@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from src.infrastructure.config.settings import settings
 from src.application.lifecycle import lifespan
 from src.application.module_registry import register_modules
+from src.infrastructure.metrics.middleware import MetricsMiddleware
 import logging
 
 logger = logging.getLogger(__name__)
@@ -30,6 +31,9 @@ def create_app() -> FastAPI:
         allow_headers=settings.cors_allow_headers,
     )
 
+    # Latencia por ruta y header X-Search-Profile opcional
+    app.add_middleware(MetricsMiddleware, profile_header=settings.search_profile_header)
+
     register_modules(app)
 
     return app
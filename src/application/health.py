@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/ready", include_in_schema=False)
+def ready(request: Request) -> JSONResponse:
+    # El balanceador no manda trafico hasta que el store este cargado y el lifespan
+    # haya levantado el watcher y el pool de busqueda
+    state = request.app.state
+    service = state.flight_events_container.service()
+    if not getattr(state, "ready", False) or not service.is_loaded:
+        return JSONResponse({"status": "starting"}, status_code=503)
+    store = service.snapshot()
+    return JSONResponse({"status": "ready", "version": store.version, "events": len(store)})
@@ -11,7 +11,30 @@ async def lifespan(app: FastAPI):
     logger.info("Starting application...")
 
     try:
+        # Cargamos e indexamos los eventos de vuelo una sola vez por proceso; con el
+        # arranque prefork ya vienen cargados del padre
+        flight_events_container = app.state.flight_events_container
+        flight_event_service = flight_events_container.service()
+        if not flight_event_service.is_loaded:
+            flight_event_service.load()
+
+        watcher = flight_events_container.watcher()
+        watcher.start()
+
+        journeys_container = app.state.journeys_container
+        route_table = journeys_container.route_table()
+        route_table.start()
+
+        # Levantamos el pool de busqueda antes del primer request
+        executor = journeys_container.executor()
+
+        app.state.ready = True
         yield
+        app.state.ready = False
+
+        await route_table.stop()
+        await watcher.stop()
+        executor.shutdown()
 
     except Exception as e:
         logger.error(f"Error during startup: {str(e)}")
@@ -32,3 +32,17 @@ def register_modules(app: FastAPI):
     journeys_container.wire(modules=["src.domain.journeys.controller"])
     app.include_router(journeys_router)
     app.state.journeys_container = journeys_container
+
+    # =========================
+    # Metrics
+    # =========================
+    from src.infrastructure.metrics.controller import router as metrics_router
+
+    app.include_router(metrics_router)
+
+    # =========================
+    # Health
+    # =========================
+    from src.application.health import router as health_router
+
+    app.include_router(health_router)
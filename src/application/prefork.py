@@ -0,0 +1,126 @@
+"""Arranque con varios workers y el schedule precargado.
+
+El proceso padre arma la app, carga e indexa los eventos de vuelo una sola vez, abre
+el socket y recien despues forkea los workers de uvicorn. Cada worker hereda el store
+ya construido y sus paginas se comparten copy-on-write mientras nadie las modifique,
+asi que agregar workers no multiplica ni el tiempo de arranque ni la memoria del
+schedule. Cada recarga las va separando: `FlightEventStore.apply` copia el indice por
+event_id y los diccionarios de buckets y agrega filas a la tabla compartida, asi que
+despues de recargar cada worker tiene su propia copia de buena parte del store. Con
+el snapshot binario una recarga mapea el archivo nuevo, y sus columnas se comparten
+entre workers a traves del page cache.
+
+En el padre no puede quedar nada corriendo antes del fork (threads, event loop, pools):
+el watcher, las rutas precalculadas y el pool de busqueda los levanta el lifespan de
+cada worker.
+"""
+import gc
+import logging
+import os
+import signal
+import socket
+from time import perf_counter
+from typing import Dict
+
+import uvicorn
+from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+# Segundos que tiene que vivir un worker para que se lo reinicie si termina
+_MIN_WORKER_UPTIME = 5.0
+
+
+def preload(app: FastAPI) -> None:
+    """Carga el store en este proceso; el lifespan de los workers lo reutiliza."""
+    start = perf_counter()
+    store = app.state.flight_events_container.service().load()
+    logger.info(f"Preloaded {len(store)} flight events in {(perf_counter() - start) * 1000:.0f}ms")
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def serve_prefork(app: FastAPI, host: str, port: int, workers: int, log_level: str) -> None:
+    """Precarga el schedule y atiende con `workers` procesos sobre el mismo socket.
+
+    El padre solo supervisa: reenvia SIGTERM/SIGINT a los workers y, si uno termina
+    sin que se haya pedido el cierre, forkea otro desde el estado precargado.
+    """
+    preload(app)
+    sock = bind_socket(host, port)
+    logger.info(f"Listening on {host}:{port} with {workers} workers")
+
+    # Lo que ya existe pasa a la generacion permanente: el GC de los workers no lo
+    # recorre y no ensucia esas paginas (que dejarian de estar compartidas)
+    gc.collect()
+    gc.freeze()
+
+    children: Dict[int, float] = {}
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(app, sock, log_level)
+        children[pid] = perf_counter()
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    for _ in range(workers):
+        spawn()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    try:
+        while children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = children.pop(pid, None)
+            if started is None or stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            # Un worker que no llega a levantar falla igual al reforkearlo: cortamos
+            # en vez de entrar en un loop de reinicios
+            if perf_counter() - started < _MIN_WORKER_UPTIME:
+                logger.error(f"Worker {pid} exited during startup ({code}), shutting down")
+                stop(signal.SIGTERM, None)
+                continue
+            logger.warning(f"Worker {pid} exited ({code}), restarting")
+            spawn()
+    finally:
+        sock.close()
+    logger.info("All workers stopped")
+
+
+def _run_worker(app: FastAPI, sock: socket.socket, log_level: str) -> None:
+    # uvicorn instala sus propios handlers para el cierre ordenado
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    code = 1
+    try:
+        server = uvicorn.Server(uvicorn.Config(app, log_level=log_level, lifespan="on"))
+        server.run(sockets=[sock])
+        # Si fallo el lifespan, run vuelve sin haber atendido nada
+        code = 0 if server.started else 3
+    except Exception:
+        logger.exception(f"Worker {os.getpid()} failed")
+    finally:
+        # Nunca volver al loop del padre
+        os._exit(code)
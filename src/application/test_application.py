@@ -0,0 +1,86 @@
+import json
+import signal
+import socket
+import subprocess
+import sys
+import textwrap
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient
+
+from src.application.app import create_app
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+# ---------------------------------------------------------------------------
+# TESTS
+# ---------------------------------------------------------------------------
+
+def test_ready_probe_waits_for_lifespan():
+    """/ready responde 503 hasta que el lifespan termina de levantar el worker y 200 despues."""
+    app = create_app()
+    client = TestClient(app)
+
+    # sin lifespan (ni store cargado) el worker todavia no puede atender
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json() == {"status": "starting"}
+
+    with client:
+        response = client.get("/ready")
+        assert response.status_code == 200
+        store = app.state.flight_events_container.service().snapshot()
+        assert response.json() == {"status": "ready", "version": store.version, "events": len(store)}
+
+    # durante el cierre deja de recibir trafico
+    assert client.get("/ready").status_code == 503
+
+
+def test_prefork_preloads_store_once_for_all_workers():
+    """En modo prefork el padre carga el schedule una vez y los workers lo heredan sin recargarlo."""
+    pytest.importorskip("uvicorn")
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    script = textwrap.dedent(f"""
+        import logging
+        from src.application.app import create_app
+        from src.application.prefork import serve_prefork
+
+        logging.basicConfig(level=logging.INFO)
+        serve_prefork(create_app(), "127.0.0.1", {port}, workers=2, log_level="warning")
+    """)
+    process = subprocess.Popen(
+        [sys.executable, "-c", script], cwd=ROOT,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+    try:
+        ready = None
+        deadline = time.monotonic() + 20
+        while ready is None and time.monotonic() < deadline:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=1) as response:
+                    ready = json.loads(response.read())
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.1)
+        assert ready is not None and ready["status"] == "ready"
+        # el store de los workers es el que cargo el padre, no uno propio
+        assert ready["version"] == 1
+    finally:
+        process.send_signal(signal.SIGTERM)
+        output, _ = process.communicate(timeout=20)
+
+    assert process.returncode == 0, output
+    assert output.count("Loaded ") == 1, output
+    assert "Preloaded" in output
+    assert "All workers stopped" in output
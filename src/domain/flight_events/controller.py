@@ -1,11 +1,26 @@
 from datetime import datetime
-from typing import List
-from fastapi import APIRouter, Depends
+from operator import attrgetter
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from dependency_injector.wiring import inject, Provide
 from pydantic import BaseModel
 
+from .serialization import flight_event_to_dict
 from .service import FlightEventService
 from .module import FlightEventsModule
+from src.infrastructure.http.pagination import (
+    PAGE_SIZE_LIMIT,
+    InvalidCursorError,
+    paginate_by_key,
+)
+from src.infrastructure.config.settings import settings
+from src.infrastructure.http.responses import (
+    conditional_headers,
+    json_response,
+    ndjson_response,
+    not_modified_response,
+)
+from src.infrastructure.metrics.profiling import stage
 
 router = APIRouter(prefix="/flight-events", tags=["flight-events"])
 
@@ -18,19 +33,42 @@ class FlightEvent(BaseModel):
     arrival_time: datetime
 
 
+# Endpoint sincronico: FastAPI lo ejecuta en su threadpool, fuera del event loop
 @router.get("", response_model=List[FlightEvent])
 @inject
-async def list_flight_events(
+def list_flight_events(
+    request: Request,
+    limit: Optional[int] = Query(
+        default=None,
+        ge=1,
+        le=PAGE_SIZE_LIMIT,
+        description="Tamaño de pagina; sin limit se devuelven todos los eventos desde el cursor",
+    ),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Cursor devuelto en el header X-Next-Cursor de la pagina anterior",
+    ),
+    format: Literal["json", "ndjson"] = Query(
+        default="json",
+        description="ndjson: un evento por linea, enviado a medida que se serializa",
+    ),
     service: FlightEventService = Depends(Provide[FlightEventsModule.service]),
 ) -> List[FlightEvent]:
-    dtos = service.list_all()
-    return [
-        FlightEvent(
-            flight_number=d.flight_number,
-            from_city=d.from_city,
-            to_city=d.to_city,
-            departure_time=d.departure_time,
-            arrival_time=d.arrival_time,
-        )
-        for d in dtos
-    ]
+    caching = conditional_headers(request, service.revision(), settings.http_cache_max_age)
+    not_modified = not_modified_response(request, caching)
+    if not_modified is not None:
+        return not_modified
+
+    # Paginas por event_id: cada una cuesta O(limit) y el cursor sobrevive a las recargas
+    store = service.snapshot()
+    try:
+        page = paginate_by_key(store.iter_by_id, attrgetter("event_id"), cursor, limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    rows = page.rows
+    headers = {**page.headers, **caching}
+    if format == "ndjson":
+        return ndjson_response(rows, flight_event_to_dict, headers=headers)
+    with stage("serialize"):
+        return json_response([flight_event_to_dict(row) for row in rows], headers=headers)
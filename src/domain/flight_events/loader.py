@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, TextIO
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+def iter_json_records(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """Itera los registros de un archivo de eventos sin cargarlo entero en memoria.
+
+    Soporta un array JSON (`[{...}, {...}]`) o JSON Lines (un objeto por linea);
+    el formato se detecta por el primer caracter del archivo.
+    """
+    with Path(path).open("r", encoding="utf-8") as f:
+        head = f.read(chunk_size)
+        stripped = head.lstrip(_WHITESPACE)
+        while head and not stripped:
+            head = f.read(chunk_size)
+            stripped = head.lstrip(_WHITESPACE)
+
+        if stripped.startswith("["):
+            yield from _iter_array(f, stripped[1:], chunk_size)
+        else:
+            yield from _iter_lines(f, head)
+
+
+def _iter_lines(f: TextIO, head: str) -> Iterator[Dict[str, Any]]:
+    # Completamos la primera linea parcial del chunk inicial y seguimos linea a linea
+    lines = (head + f.readline()).splitlines()
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _iter_array(f: TextIO, buf: str, chunk_size: int) -> Iterator[Dict[str, Any]]:
+    pos = 0
+    eof = False
+
+    while True:
+        # Salteamos espacios y separadores entre elementos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE + ",":
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            buf, pos = f.read(chunk_size), 0
+            eof = not buf
+
+        if pos >= len(buf):
+            raise ValueError("Unterminated JSON array in flight events file")
+
+        if buf[pos] == "]":
+            return
+
+        try:
+            record, end = _decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            record, end = None, len(buf)
+
+        # Si el elemento llega hasta el final del buffer puede estar incompleto:
+        # leemos otro chunk y reintentamos
+        if end >= len(buf) and not eof:
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+
+        if record is None:
+            # Forzamos el error real de parseo
+            _decoder.raw_decode(buf, pos)
+
+        yield record
+
+        pos = end
+        # Descartamos lo ya consumido para mantener la memoria acotada
+        if pos > chunk_size:
+            buf, pos = buf[pos:], 0
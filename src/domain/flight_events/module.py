@@ -1,6 +1,8 @@
 from pathlib import Path
 from dependency_injector import containers, providers
+from src.infrastructure.config.settings import settings
 from .service import FlightEventService
+from .watcher import FlightEventsWatcher
 
 
 class FlightEventsModule(containers.DeclarativeContainer):
@@ -8,9 +10,18 @@ class FlightEventsModule(containers.DeclarativeContainer):
 
     root = providers.DependenciesContainer()
 
-    data_path = str(Path(__file__).parent / "flight_events.json")
+    data_path = settings.flight_events_path or str(
+        Path(__file__).parent / "flight_events.json")
 
-    service = providers.Factory(
+    # Singleton: un unico store en memoria compartido por todos los requests
+    service = providers.Singleton(
         FlightEventService,
-        data_path=data_path
+        data_path=data_path,
+        backend=settings.flight_events_backend,
+    )
+
+    watcher = providers.Singleton(
+        FlightEventsWatcher,
+        service=service,
+        interval=settings.flight_events_reload_interval,
     )
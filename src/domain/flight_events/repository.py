@@ -0,0 +1,106 @@
+import logging
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Iterator, Literal, Optional, Tuple
+
+from .loader import iter_json_records
+from .snapshot import is_snapshot, open_snapshot
+from .store import FlightEventStore
+
+logger = logging.getLogger(__name__)
+
+FlightEventBackend = Literal["file", "sqlite"]
+
+
+class FlightEventDTO:
+    __slots__ = ("event_id", "flight_number", "from_city", "to_city",
+                 "departure_time", "arrival_time")
+
+    def __init__(self, event_id: str, flight_number: str, from_city: str, to_city: str,
+                 departure_time: datetime, arrival_time: datetime):
+        self.event_id = event_id
+        self.flight_number = flight_number
+        self.from_city = from_city
+        self.to_city = to_city
+        self.departure_time = departure_time
+        self.arrival_time = arrival_time
+
+
+class FlightEventRepository(ABC):
+    """Origen de los eventos de vuelo detras de FlightEventService.
+
+    Cada implementacion arma el store sobre el que corren las busquedas y sabe
+    detectar y aplicar los cambios de su fuente.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @abstractmethod
+    def load(self, version: int) -> FlightEventStore:
+        ...
+
+    @abstractmethod
+    def reload(self, current: FlightEventStore) -> FlightEventStore:
+        """Devuelve un store nuevo con los cambios, o `current` si no hubo ninguno."""
+
+    def view(self, store: FlightEventStore) -> FlightEventStore:
+        """Store que usa cada request; por defecto el snapshot compartido."""
+        return store
+
+    def fingerprint(self) -> Optional[Tuple[int, int]]:
+        """(mtime, size) de la fuente, para que el watcher detecte cambios sin leerla."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+
+class FileFlightEventRepository(FlightEventRepository):
+    """JSON, JSON Lines o snapshot binario: el schedule completo vive en memoria (o mmap)."""
+
+    def load(self, version: int) -> FlightEventStore:
+        if is_snapshot(self.path):
+            return open_snapshot(self.path, version=version)
+        return FlightEventStore(self.read_events(), version=version)
+
+    def reload(self, current: FlightEventStore) -> FlightEventStore:
+        # Un snapshot binario ya viene indexado: mapear el nuevo es mas barato que un diff
+        if is_snapshot(self.path):
+            store = open_snapshot(self.path, version=current.version + 1)
+            logger.info(f"Reloaded flight events snapshot (version {store.version})")
+            return store
+
+        upserts, deletes = current.diff(self.read_events())
+
+        if not upserts and not deletes:
+            return current
+
+        store = current.apply(upserts, deletes)
+        logger.info(
+            f"Reloaded flight events (version {store.version}): "
+            f"{len(upserts)} upserted, {len(deletes)} deleted"
+        )
+        return store
+
+    def read_events(self) -> Iterator[FlightEventDTO]:
+        # Streaming: los DTOs se generan de a uno, sin materializar el archivo entero
+        for e in iter_json_records(self.path):
+            yield FlightEventDTO(
+                event_id=e["event_id"],
+                flight_number=e["flight_number"],
+                from_city=e["from"],
+                to_city=e["to"],
+                departure_time=datetime.fromisoformat(e["departure_time"]),
+                arrival_time=datetime.fromisoformat(e["arrival_time"]),
+            )
+
+
+def create_repository(backend: FlightEventBackend, path: str) -> FlightEventRepository:
+    if backend == "sqlite":
+        from .sqlite import SqliteFlightEventRepository
+
+        return SqliteFlightEventRepository(path)
+    return FileFlightEventRepository(path)
@@ -0,0 +1,9 @@
+def flight_event_to_dict(event) -> dict:
+    """Mismos campos que el modelo `FlightEvent` del controller, sin pasar por pydantic."""
+    return {
+        "flight_number": event.flight_number,
+        "from_city": event.from_city,
+        "to_city": event.to_city,
+        "departure_time": event.departure_time,
+        "arrival_time": event.arrival_time,
+    }
@@ -1,40 +1,102 @@
-import json
-from pathlib import Path
-from typing import List
-from datetime import datetime
+import hashlib
+import logging
+import threading
+from typing import Callable, List, Optional, Tuple
 
+from src.infrastructure.metrics.profiling import stage
+from .repository import FlightEventBackend, FlightEventDTO, create_repository
+from .store import FlightEventStore
+from .table import FlightEventRow
 
-class FlightEventDTO:
-    def __init__(self, event_id: str, flight_number: str, from_city: str, to_city: str,
-                 departure_time: datetime, arrival_time: datetime):
-        self.event_id = event_id
-        self.flight_number = flight_number
-        self.from_city = from_city
-        self.to_city = to_city
-        self.departure_time = departure_time
-        self.arrival_time = arrival_time
+# FlightEventDTO vivia en este modulo antes de pasar a repository: se re-exporta para
+# no romper los imports existentes
+__all__ = ["FlightEventDTO", "FlightEventService"]
+
+logger = logging.getLogger(__name__)
 
 
 class FlightEventService:
-    def __init__(self, data_path: str):
+    def __init__(self, data_path: str, backend: FlightEventBackend = "file"):
         self.data_path = data_path
+        self.backend = backend
+        self._repository = create_repository(backend, data_path)
+        self._store: Optional[FlightEventStore] = None
+        # (snapshot, revision) en una sola referencia, para leerlos siempre juntos
+        self._published: Tuple[Optional[FlightEventStore], str] = (None, "")
+        self._reload_lock = threading.Lock()
+        self._listeners: List[Callable[[FlightEventStore], None]] = []
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._store is not None
+
+    def subscribe(self, listener: Callable[[FlightEventStore], None]) -> None:
+        """Registra un callback que se llama con cada nuevo snapshot luego de una recarga."""
+        self._listeners.append(listener)
+
+    def _publish(self, store: FlightEventStore, fingerprint: Optional[Tuple[int, int]]) -> None:
+        self._store = store
+        self._published = (store, _revision(fingerprint, store.version))
+        for listener in self._listeners:
+            listener(store)
+
+    def load(self) -> FlightEventStore:
+        version = 1 if self._store is None else self._store.version + 1
+        # El fingerprint se toma antes de leer: si la fuente cambia durante la carga,
+        # la proxima recarga lo detecta y la revision cambia
+        fingerprint = self._repository.fingerprint()
+        with stage("load"):
+            store = self._repository.load(version)
+        self._publish(store, fingerprint)
+        logger.info(f"Loaded {len(self._store)} flight events from {self.data_path}")
+        return self._store
+
+    def reload(self) -> FlightEventStore:
+        """Relee la fuente y aplica solo los cambios sobre el snapshot actual."""
+        with self._reload_lock:
+            current = self._store if self._store is not None else self.load()
+            fingerprint = self._repository.fingerprint()
+            store = self._repository.reload(current)
+
+            # El swap de la referencia es atomico: los requests en curso
+            # siguen usando el snapshot anterior hasta terminar
+            if store is not current:
+                self._publish(store, fingerprint)
+            return self._store
+
+    def fingerprint(self) -> Optional[Tuple[int, int]]:
+        return self._repository.fingerprint()
+
+    def revision(self) -> str:
+        """Identificador de los datos publicados, estable entre procesos (para ETags).
+
+        Sale del fingerprint de la fuente al cargarla, asi que todos los workers que
+        cargaron el mismo archivo tienen la misma revision y un reinicio con otros
+        datos nunca la repite.
+        """
+        if self._store is None:
+            self.load()
+        return self._published[1]
 
-    def list_all(self) -> List[FlightEventDTO]:
-        file_path = Path(self.data_path)
+    def snapshot(self) -> FlightEventStore:
+        # Si no se cargo en el lifespan (tests, scripts), se carga on demand
+        if self._store is None:
+            self.load()
+        return self._repository.view(self._store)
 
-        with file_path.open("r") as f:
-            events = json.load(f)
+    def published(self) -> Tuple[FlightEventStore, str]:
+        """El snapshot actual y su revision, tomados de la misma publicacion (para cursores)."""
+        if self._store is None:
+            self.load()
+        store, revision = self._published
+        return self._repository.view(store), revision
 
-        result = []
+    def list_all(self) -> List[FlightEventRow]:
+        return self.snapshot().all()
 
-        for e in events:
-            result.append(FlightEventDTO(
-                event_id=e["event_id"],
-                flight_number=e["flight_number"],
-                from_city=e["from"],
-                to_city=e["to"],
-                departure_time=datetime.fromisoformat(e["departure_time"]),
-                arrival_time=datetime.fromisoformat(e["arrival_time"]),
-            ))
 
-        return result
+def _revision(fingerprint: Optional[Tuple[int, int]], version: int) -> str:
+    # Sin fingerprint (fuente que no se puede stat) queda solo la version del proceso
+    if fingerprint is None:
+        return f"v{version}"
+    return hashlib.blake2b(repr(fingerprint).encode(), digest_size=8).hexdigest()
@@ -0,0 +1,198 @@
+"""Snapshot binario de los eventos de vuelo.
+
+Compila el JSON a un archivo versionado que se abre con `mmap`: todos los workers
+de uvicorn comparten las mismas paginas del page cache y el arranque no parsea
+ningun timestamp.
+
+Layout (little-endian, secciones alineadas a 8 bytes):
+
+    header    MAGIC, FORMAT_VERSION, cantidad de eventos, cantidad de buckets
+    directorio (offset, size) de cada seccion, en el orden de SECTIONS
+    strings   event_ids / cities / flight_numbers: offsets int32 + blob utf-8
+    records   flight_number, from_city, to_city, departure, arrival: int32 por evento
+    buckets   (dia, ciudad de origen, fila inicial, fila final) int32 por bucket
+
+Los eventos se escriben ordenados por (dia de salida, ciudad de origen, horario de
+salida), de modo que cada bucket es un rango contiguo y ordenado de filas y se mapea
+sin copiar.
+
+Uso:
+
+    python -m src.domain.flight_events.snapshot flight_events.json flight_events.bin
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, List, Sequence
+
+from .store import BucketKey, DepartureBucket, FlightEventStore
+from .table import FlightEventRow
+
+MAGIC = b"FJSNAP\x00\x00"
+# v2: filas de cada bucket ordenadas por horario de salida
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct("<8sIII")
+_SECTION = struct.Struct("<QQ")
+
+STRING_TABLES = ("event_ids", "cities", "flight_numbers")
+COLUMNS = ("flight_number", "from_city", "to_city", "departure", "arrival")
+SECTIONS = tuple(
+    f"{name}_{part}" for name in STRING_TABLES for part in ("offsets", "data")
+) + COLUMNS + ("buckets",)
+
+
+def is_snapshot(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class MappedStrings:
+    """Tabla de strings sobre el mmap: decodifica cada valor recien cuando se accede."""
+
+    __slots__ = ("_offsets", "_data", "_ids")
+
+    def __init__(self, offsets: memoryview, data: memoryview, indexed: bool = False):
+        self._offsets = offsets
+        self._data = data
+        self._ids = {self[i]: i for i in range(len(self))} if indexed else None
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return str(self._data[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+    def id_of(self, value: str):
+        return self._ids.get(value)
+
+
+class MappedFlightEventTable:
+    """Misma interfaz de lectura que FlightEventTable, con las columnas apuntando al mmap."""
+
+    writable = False
+
+    def __init__(self, sections: Dict[str, memoryview]):
+        self.event_ids = MappedStrings(
+            sections["event_ids_offsets"], sections["event_ids_data"])
+        # Pocas ciudades: se indexan para poder resolver codigo -> id
+        self.cities = MappedStrings(
+            sections["cities_offsets"], sections["cities_data"], indexed=True)
+        self.flight_numbers = MappedStrings(
+            sections["flight_numbers_offsets"], sections["flight_numbers_data"])
+        for name in COLUMNS:
+            setattr(self, name, sections[name])
+
+    def __len__(self) -> int:
+        return len(self.departure)
+
+    def row(self, i: int) -> FlightEventRow:
+        return FlightEventRow(self, i)
+
+
+def _encode_strings(values: Sequence[str]) -> List[bytes]:
+    offsets = array("i", [0])
+    data = bytearray()
+    for value in values:
+        data += value.encode("utf-8")
+        offsets.append(len(data))
+    return [offsets.tobytes(), bytes(data)]
+
+
+def write_snapshot(store: FlightEventStore, path: str) -> None:
+    """Escribe el store como snapshot binario.
+
+    Se escribe a un archivo temporal y se renombra, para que los procesos que ya
+    tienen mapeado el snapshot anterior no vean un archivo a medio escribir.
+    """
+    if sys.byteorder != "little":
+        raise RuntimeError("Binary snapshots are only supported on little-endian hosts")
+
+    table = store.table
+    keys: List[BucketKey] = sorted(store.bucket_keys())
+
+    order = array("i")
+    buckets = array("i")
+    for day, city in keys:
+        rows = store.departures(day, city).rows
+        buckets.extend((day, city, len(order), len(order) + len(rows)))
+        order.extend(rows)
+
+    sections: List[bytes] = []
+    sections += _encode_strings([table.event_ids[r] for r in order])
+    sections += _encode_strings([table.cities[i] for i in range(len(table.cities))])
+    sections += _encode_strings(
+        [table.flight_numbers[i] for i in range(len(table.flight_numbers))])
+    for name in COLUMNS:
+        column = getattr(table, name)
+        sections.append(array("i", [column[r] for r in order]).tobytes())
+    sections.append(buckets.tobytes())
+
+    offset = _HEADER.size + _SECTION.size * len(SECTIONS)
+    directory = []
+    for blob in sections:
+        offset += -offset % 8
+        directory.append((offset, len(blob)))
+        offset += len(blob)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(order), len(keys)))
+        for entry in directory:
+            f.write(_SECTION.pack(*entry))
+        for (start, _), blob in zip(directory, sections):
+            f.write(b"\x00" * (start - f.tell()))
+            f.write(blob)
+    os.replace(tmp_path, path)
+
+
+def open_snapshot(path: str, version: int = 1) -> FlightEventStore:
+    """Mapea un snapshot binario y arma el store sin copiar las columnas."""
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, format_version, _, n_buckets = _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a flight events snapshot")
+    if format_version != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported snapshot format {format_version} (expected {FORMAT_VERSION})")
+
+    view = memoryview(buffer)
+    sections: Dict[str, memoryview] = {}
+    for i, name in enumerate(SECTIONS):
+        start, size = _SECTION.unpack_from(buffer, _HEADER.size + i * _SECTION.size)
+        section = view[start:start + size]
+        sections[name] = section if name.endswith("_data") else section.cast("i")
+
+    table = MappedFlightEventTable(sections)
+
+    index = sections["buckets"]
+    buckets: Dict[BucketKey, DepartureBucket] = {}
+    for i in range(n_buckets):
+        day, city, start, end = index[4 * i:4 * i + 4]
+        buckets[(day, city)] = DepartureBucket.view(table, start, end)
+
+    return FlightEventStore.from_table(table, buckets, version=version)
+
+
+def main(argv: List[str]) -> None:
+    if len(argv) != 2:
+        raise SystemExit(
+            "usage: python -m src.domain.flight_events.snapshot <events.json> <snapshot.bin>")
+
+    from .service import FlightEventService
+
+    source, target = argv
+    store = FlightEventService(data_path=source).load()
+    write_snapshot(store, target)
+    print(f"Wrote {len(store)} flight events to {target}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,271 @@
+"""Backend SQLite para los eventos de vuelo.
+
+Para schedules que no conviene tener completos en memoria en cada worker: las
+busquedas leen de la base solo los buckets (dia, ciudad) que recorren, usando los
+indices por salida y por llegada. Todos los procesos comparten las paginas de la base
+a traves del page cache del sistema operativo.
+
+Schema (horarios en minutos desde epoch y fechas en dias desde epoch, igual que la
+tabla columnar en memoria):
+
+    flight_events(event_id, flight_number, from_city, to_city,
+                  departure_date, departure_time, arrival_date, arrival_time)
+
+Uso:
+
+    python -m src.domain.flight_events.sqlite flight_events.json flight_events.db
+"""
+import os
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .repository import FlightEventRepository
+from .store import (
+    EMPTY_ARRIVALS,
+    EMPTY_BUCKET,
+    ArrivalBucket,
+    BucketKey,
+    DepartureBucket,
+    FlightEventStore,
+)
+from .table import MINUTES_PER_DAY, FlightEventRow, FlightEventTable
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS flight_events (
+    event_id TEXT PRIMARY KEY,
+    flight_number TEXT NOT NULL,
+    from_city TEXT NOT NULL,
+    to_city TEXT NOT NULL,
+    departure_date INTEGER NOT NULL,
+    departure_time INTEGER NOT NULL,
+    arrival_date INTEGER NOT NULL,
+    arrival_time INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_flight_events_departures
+    ON flight_events (departure_date, from_city, departure_time);
+CREATE INDEX IF NOT EXISTS idx_flight_events_arrivals
+    ON flight_events (arrival_date, to_city, arrival_time);
+"""
+
+_COLUMNS = "event_id, flight_number, from_city, to_city, departure_time, arrival_time"
+
+# Tamaño del mmap de SQLite: las lecturas van directo al page cache, sin copiar a cada proceso
+_MMAP_SIZE = 1 << 30
+
+# Filas por lote al recorrer la tabla completa (listados)
+_BATCH_SIZE = 1024
+
+
+class SqliteFlightEventRepository(FlightEventRepository):
+    """Eventos en una base SQLite de solo lectura, con una conexion por thread."""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._uri = f"{Path(path).resolve().as_uri()}?mode=ro"
+        self._local = threading.local()
+        self._fingerprint: Optional[Tuple[int, int]] = None
+        self._generation = 0
+
+    def connection(self) -> sqlite3.Connection:
+        local = self._local
+        # Una conexion no puede cruzar un fork (los procesos del pool abren la suya) y
+        # despues de una recarga hay que reabrir: la base pudo reemplazarse por otro archivo
+        key = (os.getpid(), self._generation)
+        if getattr(local, "key", None) != key:
+            if getattr(local, "connection", None) is not None and local.key[0] == key[0]:
+                local.connection.close()
+            connection = sqlite3.connect(self._uri, uri=True)
+            connection.execute("PRAGMA query_only = ON")
+            connection.execute(f"PRAGMA mmap_size = {_MMAP_SIZE}")
+            local.connection, local.key = connection, key
+        return local.connection
+
+    def query(self, sql: str, params: Tuple = ()) -> List[tuple]:
+        return self.connection().execute(sql, params).fetchall()
+
+    def load(self, version: int) -> "SqliteFlightEventStore":
+        self._fingerprint = self.fingerprint()
+        self._generation += 1
+        (count,) = self.query("SELECT COUNT(*) FROM flight_events")[0]
+        return SqliteFlightEventStore(self, version, count)
+
+    def reload(self, current: FlightEventStore) -> FlightEventStore:
+        if self.fingerprint() == self._fingerprint:
+            return current
+        return self.load(current.version + 1)
+
+    def view(self, store: "SqliteFlightEventStore") -> "SqliteFlightEventStore":
+        # Cada request arma su propia tabla con los buckets que lee y la descarta al terminar
+        return store.view()
+
+    def fingerprint(self) -> Optional[Tuple[int, int]]:
+        # En modo WAL los commits recientes viven en el archivo -wal
+        stats = []
+        for path in (self.path, f"{self.path}-wal"):
+            try:
+                stats.append(os.stat(path))
+            except FileNotFoundError:
+                continue
+        if not stats:
+            return None
+        return max(s.st_mtime_ns for s in stats), sum(s.st_size for s in stats)
+
+
+class SqliteFlightEventStore:
+    """Misma interfaz de lectura que FlightEventStore, cargando los buckets bajo demanda.
+
+    Las filas leidas se agregan a una FlightEventTable propia de la vista, asi que la
+    memoria de un request es proporcional a los buckets que recorre su busqueda y no
+    al tamaño del schedule. Las recargas no aplican diffs: cambia la version y todos
+    los caches derivados se invalidan (`changed_days` = None).
+    """
+
+    changed_days = None
+
+    def __init__(self, repository: SqliteFlightEventRepository, version: int, count: int):
+        self.version = version
+        self.table = FlightEventTable()
+        self._repository = repository
+        self._count = count
+        self._rows: Dict[str, int] = {}
+        self._buckets: Dict[BucketKey, DepartureBucket] = {}
+        self._arrivals: Dict[BucketKey, ArrivalBucket] = {}
+
+    def view(self) -> "SqliteFlightEventStore":
+        return SqliteFlightEventStore(self._repository, self.version, self._count)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _append(self, records: Iterable[tuple]) -> List[int]:
+        rows = []
+        for record in records:
+            row = self._rows.get(record[0])
+            if row is None:
+                row = self._rows[record[0]] = self.table.append_values(*record)
+            rows.append(row)
+        return rows
+
+    def city_id(self, city: str) -> int:
+        # Una ciudad sin vuelos simplemente tiene buckets vacios
+        return self.table.cities.intern(city)
+
+    def bucket_keys(self) -> List[BucketKey]:
+        return [
+            (day, self.city_id(city)) for day, city in self._repository.query(
+                "SELECT DISTINCT departure_date, from_city FROM flight_events")
+        ]
+
+    def departures(self, day: int, city: int) -> DepartureBucket:
+        bucket = self._buckets.get((day, city))
+        if bucket is None:
+            records = self._repository.query(
+                f"SELECT {_COLUMNS} FROM flight_events"
+                " WHERE departure_date = ? AND from_city = ? ORDER BY departure_time",
+                (day, self.table.cities[city]),
+            )
+            bucket = DepartureBucket(self.table, self._append(records)) if records else EMPTY_BUCKET
+            self._buckets[(day, city)] = bucket
+        return bucket
+
+    def arrivals(self, day: int, city: int) -> ArrivalBucket:
+        bucket = self._arrivals.get((day, city))
+        if bucket is None:
+            records = self._repository.query(
+                f"SELECT {_COLUMNS} FROM flight_events"
+                " WHERE arrival_date = ? AND to_city = ? ORDER BY arrival_time",
+                (day, self.table.cities[city]),
+            )
+            bucket = ArrivalBucket(self.table, self._append(records)) if records else EMPTY_ARRIVALS
+            self._arrivals[(day, city)] = bucket
+        return bucket
+
+    def get(self, event_id: str) -> Optional[FlightEventRow]:
+        records = self._repository.query(
+            f"SELECT {_COLUMNS} FROM flight_events WHERE event_id = ?", (event_id,))
+        if not records:
+            return None
+        return FlightEventRow(self.table, self._append(records)[0])
+
+    def all(self) -> List[FlightEventRow]:
+        return list(self.iter_rows())
+
+    def iter_rows(self) -> Iterator[FlightEventRow]:
+        """Recorre la tabla en orden de insercion (para paginar, `iter_by_id`)."""
+        return self._iter_keyset("rowid", None, None)
+
+    def iter_by_id(
+        self, after: Optional[str] = None, limit: Optional[int] = None
+    ) -> Iterator[FlightEventRow]:
+        """Eventos en orden de event_id desde el siguiente a `after`, usando el indice de la PK."""
+        return self._iter_keyset("event_id", after, limit)
+
+    def _iter_keyset(self, key: str, after, limit: Optional[int]) -> Iterator[FlightEventRow]:
+        # En lotes por clave, cada uno con su propia query y su tabla temporal: un
+        # StreamingResponse retoma el generador en otro thread del pool, asi que ningun
+        # cursor puede quedar abierto entre un lote y el siguiente
+        while limit is None or limit > 0:
+            size = _BATCH_SIZE if limit is None else min(_BATCH_SIZE, limit)
+            where, params = ("", (size,)) if after is None else (f" WHERE {key} > ?", (after, size))
+            records = self._repository.query(
+                f"SELECT {key}, {_COLUMNS} FROM flight_events{where} ORDER BY {key} LIMIT ?", params)
+            table = FlightEventTable()
+            for record in records:
+                yield FlightEventRow(table, table.append_values(*record[1:]))
+            if len(records) < size:
+                return
+            after = records[-1][0]
+            if limit is not None:
+                limit -= len(records)
+
+
+def write_sqlite(store: FlightEventStore, path: str) -> None:
+    """Crea la base SQLite a partir de un store (archivo temporal + rename, como los snapshots)."""
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    table = store.table
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.executescript(SCHEMA)
+        connection.executemany(
+            "INSERT INTO flight_events VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    table.event_ids[row],
+                    table.flight_numbers[table.flight_number[row]],
+                    table.cities[table.from_city[row]],
+                    table.cities[table.to_city[row]],
+                    table.departure[row] // MINUTES_PER_DAY,
+                    table.departure[row],
+                    table.arrival[row] // MINUTES_PER_DAY,
+                    table.arrival[row],
+                )
+                for row in store.live_rows()
+            ),
+        )
+        connection.commit()
+    finally:
+        connection.close()
+    os.replace(tmp_path, path)
+
+
+def main(argv: List[str]) -> None:
+    if len(argv) != 2:
+        raise SystemExit(
+            "usage: python -m src.domain.flight_events.sqlite <events.json> <events.db>")
+
+    from .service import FlightEventService
+
+    source, target = argv
+    store = FlightEventService(data_path=source).load()
+    write_sqlite(store, target)
+    print(f"Wrote {len(store)} flight events to {target}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,283 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .table import MINUTES_PER_DAY, FlightEventRow, FlightEventTable, to_minutes
+
+BucketKey = Tuple[int, int]
+
+
+def _event_key(e) -> tuple:
+    return (e.flight_number, e.from_city, e.to_city,
+            to_minutes(e.departure_time), to_minutes(e.arrival_time))
+
+
+def _row_key(table: FlightEventTable, row: int) -> tuple:
+    return (
+        table.flight_numbers[table.flight_number[row]],
+        table.cities[table.from_city[row]],
+        table.cities[table.to_city[row]],
+        table.departure[row],
+        table.arrival[row],
+    )
+
+
+class DepartureBucket:
+    """Salidas de una ciudad en un dia, como columnas paralelas de enteros ordenadas por horario.
+
+    Al estar ordenadas por `departure`, las salidas dentro de una ventana de tiempo
+    se obtienen con `bisect` sin recorrer el bucket entero.
+    """
+
+    __slots__ = ("rows", "departure", "arrival", "to_city")
+
+    def __init__(self, table: FlightEventTable, rows: Iterable[int]):
+        self.rows = array("i", sorted(rows, key=table.departure.__getitem__))
+        self.departure = array("i", [table.departure[r] for r in self.rows])
+        self.arrival = array("i", [table.arrival[r] for r in self.rows])
+        self.to_city = array("i", [table.to_city[r] for r in self.rows])
+
+    @classmethod
+    def view(cls, table, start: int, end: int) -> "DepartureBucket":
+        """Bucket sin copia sobre un rango contiguo de filas ya ordenado (snapshots mapeados)."""
+        bucket = cls.__new__(cls)
+        bucket.rows = range(start, end)
+        bucket.departure = table.departure[start:end]
+        bucket.arrival = table.arrival[start:end]
+        bucket.to_city = table.to_city[start:end]
+        return bucket
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def window(self, after: int, until: int) -> range:
+        """Posiciones de las salidas con horario en (after, until]."""
+        return range(
+            bisect_right(self.departure, after),
+            bisect_right(self.departure, until),
+        )
+
+
+class ArrivalBucket:
+    """Llegadas a una ciudad en un dia, ordenadas por horario de llegada.
+
+    Es el indice espejo de DepartureBucket que usa la busqueda inversa (arrive-by).
+    """
+
+    __slots__ = ("rows", "arrival", "departure", "from_city")
+
+    def __init__(self, table: FlightEventTable, rows: Iterable[int]):
+        self.rows = array("i", sorted(rows, key=table.arrival.__getitem__))
+        self.arrival = array("i", [table.arrival[r] for r in self.rows])
+        self.departure = array("i", [table.departure[r] for r in self.rows])
+        self.from_city = array("i", [table.from_city[r] for r in self.rows])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def window(self, since: int, before: int) -> range:
+        """Posiciones de las llegadas con horario en [since, before)."""
+        return range(
+            bisect_left(self.arrival, since),
+            bisect_left(self.arrival, before),
+        )
+
+
+class FlightEventStore:
+    """Snapshot inmutable de los eventos de vuelo, indexado por dia de salida y ciudad de origen.
+
+    Los eventos viven en una FlightEventTable columnar; los indices guardan filas y
+    copias de las columnas que usa la busqueda. Las recargas no modifican un snapshot
+    existente: `apply` devuelve uno nuevo que comparte la tabla (append-only) y los
+    buckets que no cambiaron, asi los requests en curso nunca ven un indice a medio
+    construir.
+    """
+
+    def __init__(self, events: Iterable = (), version: int = 1):
+        self.version = version
+        # Dias de salida afectados respecto del snapshot anterior (None = todos)
+        self.changed_days: Optional[FrozenSet[int]] = None
+        self.table = FlightEventTable()
+        self._by_id: Optional[Dict[str, int]] = {}
+        # event_ids ordenados, para paginar por clave; se arman con el primer listado
+        self._sorted_ids: Optional[List[str]] = None
+        self._buckets: Dict[BucketKey, DepartureBucket] = {}
+        # Indice por (dia de llegada, ciudad de destino); se arma con la primera busqueda inversa
+        self._arrivals: Optional[Dict[BucketKey, ArrivalBucket]] = None
+
+        rows_by_key: Dict[BucketKey, array] = {}
+        for e in events:
+            row = self.table.append(e)
+            previous = self._by_id.get(e.event_id)
+            if previous is not None:
+                rows_by_key[self._key(previous)].remove(previous)
+            self._by_id[e.event_id] = row
+            rows_by_key.setdefault(self._key(row), array("i")).append(row)
+
+        for key, rows in rows_by_key.items():
+            self._buckets[key] = DepartureBucket(self.table, rows)
+
+    @classmethod
+    def from_table(
+        cls, table, buckets: Dict[BucketKey, DepartureBucket], version: int = 1
+    ) -> "FlightEventStore":
+        """Arma un store sobre una tabla ya indexada (por ejemplo un snapshot binario mapeado)."""
+        store = cls.__new__(cls)
+        store.version = version
+        store.changed_days = None
+        store.table = table
+        store._buckets = buckets
+        store._arrivals = None
+        # El indice por event_id se construye recien cuando se necesita
+        store._by_id = None
+        store._sorted_ids = None
+        return store
+
+    def __len__(self) -> int:
+        if self._by_id is None:
+            return len(self.table)
+        return len(self._by_id)
+
+    def _rows_by_id(self) -> Dict[str, int]:
+        if self._by_id is None:
+            ids = self.table.event_ids
+            self._by_id = {ids[row]: row for row in range(len(ids))}
+        return self._by_id
+
+    def _key(self, row: int) -> BucketKey:
+        return self.table.departure[row] // MINUTES_PER_DAY, self.table.from_city[row]
+
+    def _arrival_key(self, row: int) -> BucketKey:
+        return self.table.arrival[row] // MINUTES_PER_DAY, self.table.to_city[row]
+
+    def live_rows(self) -> Iterable[int]:
+        """Filas de `table` vigentes en este snapshot (la tabla comparte filas reemplazadas)."""
+        return range(len(self.table)) if self._by_id is None else self._by_id.values()
+
+    def bucket_keys(self) -> List[BucketKey]:
+        return list(self._buckets)
+
+    def all(self) -> List[FlightEventRow]:
+        return [FlightEventRow(self.table, row) for row in self.live_rows()]
+
+    def iter_rows(self) -> Iterator[FlightEventRow]:
+        """Igual que `all()`, pero generando las filas de a una (para paginar, `iter_by_id`)."""
+        for row in self.live_rows():
+            yield FlightEventRow(self.table, row)
+
+    def iter_by_id(
+        self, after: Optional[str] = None, limit: Optional[int] = None
+    ) -> Iterator[FlightEventRow]:
+        """Eventos en orden de event_id, empezando por el siguiente a `after`."""
+        rows_by_id = self._rows_by_id()
+        ids = self._sorted_ids
+        if ids is None:
+            # Si dos threads lo arman a la vez ambos obtienen la misma lista
+            ids = self._sorted_ids = sorted(rows_by_id)
+        start = 0 if after is None else bisect_right(ids, after)
+        stop = None if limit is None else start + limit
+        for event_id in islice(ids, start, stop):
+            yield FlightEventRow(self.table, rows_by_id[event_id])
+
+    def get(self, event_id: str) -> Optional[FlightEventRow]:
+        row = self._rows_by_id().get(event_id)
+        return None if row is None else FlightEventRow(self.table, row)
+
+    def city_id(self, city: str) -> Optional[int]:
+        return self.table.cities.id_of(city)
+
+    def departures(self, day: int, city: int) -> DepartureBucket:
+        return self._buckets.get((day, city), EMPTY_BUCKET)
+
+    def arrivals(self, day: int, city: int) -> ArrivalBucket:
+        if self._arrivals is None:
+            # Si dos threads lo arman a la vez ambos obtienen el mismo indice
+            rows_by_key: Dict[BucketKey, array] = {}
+            for row in self.live_rows():
+                rows_by_key.setdefault(self._arrival_key(row), array("i")).append(row)
+            self._arrivals = {
+                key: ArrivalBucket(self.table, rows) for key, rows in rows_by_key.items()}
+        return self._arrivals.get((day, city), EMPTY_ARRIVALS)
+
+    def diff(self, events: Iterable) -> Tuple[list, List[str]]:
+        """Compara contra un nuevo set de eventos por `event_id`.
+
+        Devuelve los eventos nuevos o modificados y los ids que ya no existen.
+        """
+        rows_by_id = self._rows_by_id()
+        upserts = []
+        seen: Set[str] = set()
+
+        for e in events:
+            seen.add(e.event_id)
+            row = rows_by_id.get(e.event_id)
+            if row is None or _row_key(self.table, row) != _event_key(e):
+                upserts.append(e)
+
+        deletes = [event_id for event_id in rows_by_id if event_id not in seen]
+        return upserts, deletes
+
+    def apply(self, upserts: list, deletes: List[str]) -> "FlightEventStore":
+        """Devuelve un nuevo snapshot con los cambios aplicados solo a los buckets afectados."""
+        rows_by_id = self._rows_by_id()
+
+        # Si la tabla acumula demasiadas filas muertas (o es de solo lectura), se reconstruye de cero
+        dead = len(self.table) - len(rows_by_id)
+        if not self.table.writable or dead + len(upserts) > 2 * len(rows_by_id) + 1024:
+            deleted = set(deletes) | {e.event_id for e in upserts}
+            live = [r for r in self.all() if r.event_id not in deleted]
+            return FlightEventStore(live + list(upserts), version=self.version + 1)
+
+        store = FlightEventStore.__new__(FlightEventStore)
+        store.version = self.version + 1
+        store.table = self.table
+        store._by_id = dict(rows_by_id)
+        store._sorted_ids = None
+        store._buckets = dict(self._buckets)
+        store._arrivals = None if self._arrivals is None else dict(self._arrivals)
+
+        removed: Dict[BucketKey, Set[int]] = {}
+        added: Dict[BucketKey, List[int]] = {}
+        removed_arrivals: Dict[BucketKey, Set[int]] = {}
+        added_arrivals: Dict[BucketKey, List[int]] = {}
+
+        for event_id in deletes + [e.event_id for e in upserts]:
+            row = store._by_id.pop(event_id, None)
+            if row is not None:
+                removed.setdefault(store._key(row), set()).add(row)
+                removed_arrivals.setdefault(store._arrival_key(row), set()).add(row)
+
+        for e in upserts:
+            row = store.table.append(e)
+            store._by_id[e.event_id] = row
+            added.setdefault(store._key(row), []).append(row)
+            added_arrivals.setdefault(store._arrival_key(row), []).append(row)
+
+        store.changed_days = frozenset(day for day, _ in removed.keys() | added.keys())
+
+        for key in removed.keys() | added.keys():
+            gone = removed.get(key, set())
+            rows = [r for r in store.departures(*key).rows if r not in gone]
+            rows += added.get(key, [])
+            if rows:
+                store._buckets[key] = DepartureBucket(store.table, rows)
+            else:
+                store._buckets.pop(key, None)
+
+        # El indice por llegada se actualiza igual, solo si el snapshot anterior ya lo tenia
+        if store._arrivals is not None:
+            for key in removed_arrivals.keys() | added_arrivals.keys():
+                gone = removed_arrivals.get(key, set())
+                rows = [r for r in store.arrivals(*key).rows if r not in gone]
+                rows += added_arrivals.get(key, [])
+                if rows:
+                    store._arrivals[key] = ArrivalBucket(store.table, rows)
+                else:
+                    store._arrivals.pop(key, None)
+
+        return store
+
+
+EMPTY_BUCKET = DepartureBucket(FlightEventTable(), ())
+EMPTY_ARRIVALS = ArrivalBucket(FlightEventTable(), ())
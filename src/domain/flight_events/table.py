@@ -0,0 +1,146 @@
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+EPOCH = datetime(1970, 1, 1)
+MINUTES_PER_DAY = 24 * 60
+
+_MINUTE = timedelta(minutes=1)
+
+
+def to_minutes(value: datetime) -> int:
+    """Convierte un datetime (naive) a minutos desde epoch."""
+    return (value - EPOCH) // _MINUTE
+
+
+def from_minutes(minutes: int) -> datetime:
+    return EPOCH + timedelta(minutes=minutes)
+
+
+def to_day(value: date) -> int:
+    """Numero de dia desde epoch, usado como clave de los buckets por fecha."""
+    return (value - EPOCH.date()).days
+
+
+def from_day(day: int) -> date:
+    return EPOCH.date() + timedelta(days=day)
+
+
+class StringPool:
+    """Strings internados: cada valor distinto se guarda una sola vez y se referencia por id."""
+
+    __slots__ = ("_values", "_ids")
+
+    def __init__(self, values: Iterable[str] = ()):
+        self._values: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for value in values:
+            self.intern(value)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, i: int) -> str:
+        return self._values[i]
+
+    def intern(self, value: str) -> int:
+        i = self._ids.get(value)
+        if i is None:
+            i = len(self._values)
+            self._values.append(value)
+            self._ids[value] = i
+        return i
+
+    def id_of(self, value: str) -> Optional[int]:
+        return self._ids.get(value)
+
+
+class FlightEventTable:
+    """Eventos de vuelo en formato columnar.
+
+    Ciudades y numeros de vuelo se guardan internados y los horarios como minutos
+    desde epoch en arrays de int32. La tabla es append-only: las filas existentes
+    nunca se modifican, por lo que puede compartirse entre snapshots.
+    """
+
+    writable = True
+
+    def __init__(self):
+        self.cities = StringPool()
+        self.flight_numbers = StringPool()
+        self.event_ids: List[str] = []
+        self.flight_number = array("i")
+        self.from_city = array("i")
+        self.to_city = array("i")
+        self.departure = array("i")
+        self.arrival = array("i")
+
+    def __len__(self) -> int:
+        return len(self.event_ids)
+
+    def append(self, event) -> int:
+        """Agrega un evento (cualquier objeto con los atributos de FlightEventDTO) y devuelve su fila."""
+        return self.append_values(
+            event.event_id,
+            event.flight_number,
+            event.from_city,
+            event.to_city,
+            to_minutes(event.departure_time),
+            to_minutes(event.arrival_time),
+        )
+
+    def append_values(
+        self,
+        event_id: str,
+        flight_number: str,
+        from_city: str,
+        to_city: str,
+        departure: int,
+        arrival: int,
+    ) -> int:
+        """Igual que `append`, con los horarios ya en minutos desde epoch."""
+        row = len(self.event_ids)
+        self.event_ids.append(event_id)
+        self.flight_number.append(self.flight_numbers.intern(flight_number))
+        self.from_city.append(self.cities.intern(from_city))
+        self.to_city.append(self.cities.intern(to_city))
+        self.departure.append(departure)
+        self.arrival.append(arrival)
+        return row
+
+    def row(self, i: int) -> "FlightEventRow":
+        return FlightEventRow(self, i)
+
+
+class FlightEventRow:
+    """Vista liviana de una fila de la tabla, con la misma interfaz que FlightEventDTO."""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: FlightEventTable, row: int):
+        self._table = table
+        self._row = row
+
+    @property
+    def event_id(self) -> str:
+        return self._table.event_ids[self._row]
+
+    @property
+    def flight_number(self) -> str:
+        return self._table.flight_numbers[self._table.flight_number[self._row]]
+
+    @property
+    def from_city(self) -> str:
+        return self._table.cities[self._table.from_city[self._row]]
+
+    @property
+    def to_city(self) -> str:
+        return self._table.cities[self._table.to_city[self._row]]
+
+    @property
+    def departure_time(self) -> datetime:
+        return from_minutes(self._table.departure[self._row])
+
+    @property
+    def arrival_time(self) -> datetime:
+        return from_minutes(self._table.arrival[self._row])
@@ -0,0 +1,320 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from itertools import islice
+from operator import attrgetter
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from src.domain.flight_events.loader import iter_json_records
+from src.domain.flight_events.serialization import flight_event_to_dict
+from src.domain.flight_events.service import FlightEventService
+from src.domain.flight_events.snapshot import MappedFlightEventTable, write_snapshot
+from src.domain.flight_events.sqlite import write_sqlite
+from src.domain.flight_events.store import FlightEventStore
+from src.domain.flight_events.table import to_day
+from src.infrastructure.http.caching import entity_tag, etag_matches
+from src.infrastructure.http.encoding import iter_ndjson
+from src.infrastructure.http.pagination import (
+    InvalidCursorError,
+    encode_cursor,
+    paginate,
+    paginate_by_key,
+)
+
+DATA_PATH = str(Path(__file__).parent / "flight_events.json")
+
+
+def build_service() -> FlightEventService:
+    return FlightEventService(data_path=DATA_PATH)
+
+
+def departing_flights(store: FlightEventStore, flight_date: date, city: str) -> List[str]:
+    bucket = store.departures(to_day(flight_date), store.city_id(city))
+    return sorted(store.table.row(r).flight_number for r in bucket.rows)
+
+
+# ---------------------------------------------------------------------------
+# TESTS
+# ---------------------------------------------------------------------------
+
+def test_snapshot_is_loaded_once():
+    """El store se carga una sola vez y se reutiliza entre llamadas."""
+    service = build_service()
+
+    store = service.snapshot()
+
+    assert service.snapshot() is store
+    assert len(service.list_all()) == len(store)
+
+
+def test_departures_indexed_by_date_and_origin():
+    """Las salidas se obtienen por fecha y ciudad de origen sin recorrer todo el dataset."""
+    store = build_service().snapshot()
+
+    assert departing_flights(store, date(2025, 2, 1), "EZE") == [
+        "AR1000", "AR2000", "AV4000", "LA3000"]
+    assert departing_flights(store, date(2025, 2, 2), "MAD") == []
+
+
+def test_reload_applies_only_changes(tmp_path):
+    """La recarga aplica altas, bajas y modificaciones sin tocar el snapshot anterior."""
+    events = json.loads(Path(DATA_PATH).read_text())
+    data_path = tmp_path / "flight_events.json"
+    data_path.write_text(json.dumps(events))
+
+    service = FlightEventService(data_path=str(data_path))
+    before = service.snapshot()
+
+    # baja de AR1000, cambio de horario de AR2000 y alta de un vuelo nuevo
+    events = [e for e in events if e["event_id"] != "AR1000-2025-02-01"]
+    for e in events:
+        if e["event_id"] == "AR2000-2025-02-01":
+            e["departure_time"] = "2025-02-01T09:30:00"
+    events.append({
+        "event_id": "AR1002-2025-02-01",
+        "flight_number": "AR1002",
+        "from": "EZE",
+        "to": "MIA",
+        "departure_time": "2025-02-01T20:00:00",
+        "arrival_time": "2025-02-02T04:00:00",
+    })
+    data_path.write_text(json.dumps(events))
+
+    after = service.reload()
+
+    assert after is not before
+    assert after.version == before.version + 1
+    assert departing_flights(after, date(2025, 2, 1), "EZE") == [
+        "AR1002", "AR2000", "AV4000", "LA3000"]
+    assert after.get("AR2000-2025-02-01").departure_time.minute == 30
+
+    # el snapshot anterior no cambia
+    assert departing_flights(before, date(2025, 2, 1), "EZE") == [
+        "AR1000", "AR2000", "AV4000", "LA3000"]
+    # los buckets no afectados se comparten entre snapshots
+    hkg = (to_day(date(2025, 3, 5)), before.city_id("HKG"))
+    assert after.departures(*hkg) is before.departures(*hkg)
+
+
+def test_reload_without_changes_keeps_snapshot(tmp_path):
+    """Si el contenido no cambio, no se genera un snapshot nuevo."""
+    data_path = tmp_path / "flight_events.json"
+    data_path.write_text(Path(DATA_PATH).read_text())
+    service = FlightEventService(data_path=str(data_path))
+    before = service.snapshot()
+
+    assert service.reload() is before
+
+
+def test_streaming_loader_matches_json_load():
+    """El loader en streaming devuelve los mismos registros que json.load, aun con chunks chicos."""
+    expected = json.loads(Path(DATA_PATH).read_text())
+
+    assert list(iter_json_records(DATA_PATH, chunk_size=7)) == expected
+
+
+def test_streaming_loader_supports_json_lines(tmp_path):
+    """Tambien se aceptan archivos JSON Lines (un evento por linea)."""
+    expected = json.loads(Path(DATA_PATH).read_text())
+    data_path = tmp_path / "flight_events.jsonl"
+    data_path.write_text("\n".join(json.dumps(e) for e in expected) + "\n")
+
+    assert list(iter_json_records(str(data_path), chunk_size=16)) == expected
+
+    service = FlightEventService(data_path=str(data_path))
+    assert len(service.list_all()) == len(expected)
+
+
+def test_table_rows_match_source_events():
+    """La tabla columnar interna ciudades/vuelos y sus vistas reproducen los eventos originales."""
+    store = build_service().snapshot()
+    expected = json.loads(Path(DATA_PATH).read_text())
+
+    assert len(store.table.cities) < len(expected)
+    for e in expected:
+        row = store.get(e["event_id"])
+        assert (row.flight_number, row.from_city, row.to_city) == (
+            e["flight_number"], e["from"], e["to"])
+        assert row.departure_time.isoformat() == e["departure_time"]
+        assert row.arrival_time.isoformat() == e["arrival_time"]
+
+
+def test_binary_snapshot_roundtrip(tmp_path):
+    """El snapshot binario mapeado devuelve los mismos eventos e indices que el JSON."""
+    snapshot_path = str(tmp_path / "flight_events.bin")
+    store = build_service().snapshot()
+    write_snapshot(store, snapshot_path)
+
+    service = FlightEventService(data_path=snapshot_path)
+    mapped = service.snapshot()
+
+    assert isinstance(mapped.table, MappedFlightEventTable)
+    assert len(mapped) == len(store)
+    assert departing_flights(mapped, date(2025, 2, 1), "EZE") == departing_flights(
+        store, date(2025, 2, 1), "EZE")
+    for e in store.all():
+        row = mapped.get(e.event_id)
+        assert (row.flight_number, row.from_city, row.to_city,
+                row.departure_time, row.arrival_time) == (
+            e.flight_number, e.from_city, e.to_city, e.departure_time, e.arrival_time)
+
+
+def test_paginated_ndjson_listing_covers_all_events():
+    """Recorrer las paginas con el cursor devuelve todos los eventos una sola vez, como NDJSON."""
+    store = build_service().snapshot()
+    event_id = attrgetter("event_id")
+
+    lines, cursor = [], None
+    while True:
+        page = paginate_by_key(store.iter_by_id, event_id, cursor, limit=3)
+        chunks = iter_ndjson(page.rows, flight_event_to_dict, batch_size=2)
+        lines += b"".join(chunks).decode().splitlines()
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    expected = [
+        {**flight_event_to_dict(e),
+         "departure_time": e.departure_time.isoformat(),
+         "arrival_time": e.arrival_time.isoformat()}
+        for e in sorted(store.all(), key=event_id)
+    ]
+    assert [json.loads(line) for line in lines] == expected
+
+    # El cursor es el ultimo event_id: sigue valido despues de una recarga y la
+    # pagina siguiente ya refleja los cambios
+    ids = sorted(e.event_id for e in store.all())
+    first = paginate_by_key(store.iter_by_id, event_id, None, limit=3)
+    assert [e.event_id for e in first.rows] == ids[:3]
+    reloaded = store.apply([], deletes=[ids[3]])
+    rest = paginate_by_key(reloaded.iter_by_id, event_id, first.next_cursor, limit=None)
+    assert [e.event_id for e in rest.rows] == ids[4:]
+    revision = build_service().revision()
+    with pytest.raises(InvalidCursorError):
+        paginate_by_key(store.iter_by_id, event_id, encode_cursor(revision, 3), limit=3)
+
+    # Los cursores por posicion (busqueda de journeys) no sobreviven a una recarga
+    assert paginate(len(store), revision, encode_cursor(revision, 3), limit=3).start == 3
+    with pytest.raises(InvalidCursorError):
+        paginate(len(store), "v2", encode_cursor(revision, 3), limit=3)
+
+
+def test_sqlite_backend_matches_file_backend(tmp_path):
+    """El backend SQLite devuelve los mismos eventos e indices que el JSON y detecta cambios en la base."""
+    db_path = str(tmp_path / "flight_events.db")
+    store = build_service().snapshot()
+    write_sqlite(store, db_path)
+
+    service = FlightEventService(data_path=db_path, backend="sqlite")
+    view = service.snapshot()
+
+    assert len(view) == len(store)
+    assert sorted(view.bucket_keys()) == sorted(
+        (day, view.city_id(store.table.cities[city])) for day, city in store.bucket_keys())
+    assert departing_flights(view, date(2025, 2, 1), "EZE") == departing_flights(
+        store, date(2025, 2, 1), "EZE")
+    assert departing_flights(view, date(2025, 2, 1), "XXX") == []
+
+    mia = store.city_id("MIA")
+    for day, _ in store.bucket_keys():
+        expected = [store.table.event_ids[r] for r in store.arrivals(day, mia).rows]
+        assert [view.table.event_ids[r] for r in view.arrivals(day, view.city_id("MIA")).rows] == expected
+
+    fields = ("event_id", "flight_number", "from_city", "to_city", "departure_time", "arrival_time")
+    rows = [tuple(getattr(e, f) for f in fields) for e in view.iter_rows()]
+    assert rows == [tuple(getattr(e, f) for f in fields) for e in store.all()]
+    ids = sorted(e.event_id for e in store.all())
+    assert [e.event_id for e in view.iter_by_id()] == ids
+    assert [e.event_id for e in view.iter_by_id(ids[2], limit=3)] == [
+        e.event_id for e in store.iter_by_id(ids[2], limit=3)] == ids[3:6]
+    assert view.get(rows[0][0]).flight_number == rows[0][1]
+    assert view.get("missing") is None
+
+    # Sin cambios en la base se mantiene la version; al reemplazarla se publica una nueva
+    assert service.reload().version == view.version
+    fewer = FlightEventStore(list(store.all())[1:])
+    write_sqlite(fewer, db_path)
+    os.utime(db_path, ns=(0, 0))
+    reloaded = service.reload()
+    assert reloaded.version == view.version + 1
+    assert len(service.snapshot()) == len(store) - 1
+
+
+def test_etag_follows_data_revision_and_query(tmp_path):
+    """El ETag es el mismo entre procesos con los mismos datos y cambia con una recarga o con la query."""
+    data_path = tmp_path / "flight_events.json"
+    events = json.loads(Path(DATA_PATH).read_text())
+    data_path.write_text(json.dumps(events))
+
+    service = FlightEventService(data_path=str(data_path))
+    revision = service.revision()
+    # otro worker que carga el mismo archivo tiene la misma revision
+    assert FlightEventService(data_path=str(data_path)).revision() == revision
+
+    etag = entity_tag(revision, "/flight-events", [("limit", "10"), ("format", "json")])
+    assert etag == entity_tag(revision, "/flight-events", [("format", "json"), ("limit", "10")])
+    assert etag != entity_tag(revision, "/flight-events", [("limit", "20"), ("format", "json")])
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+    # una recarga sin cambios mantiene la revision; con cambios la renueva
+    service.reload()
+    assert service.revision() == revision
+    data_path.write_text(json.dumps(events[1:]))
+    os.utime(data_path, ns=(0, 0))
+    service.reload()
+    assert service.revision() != revision
+    assert not etag_matches(
+        etag, entity_tag(service.revision(), "/flight-events", [("limit", "10"), ("format", "json")]))
+
+
+def test_sqlite_listing_streams_more_than_one_batch(tmp_path):
+    """El listado ndjson sobre SQLite sigue entre lotes aunque el StreamingResponse cambie de thread."""
+    pytest.importorskip("fastapi")
+    from dependency_injector import providers
+    from fastapi.testclient import TestClient
+
+    from src.application.app import create_app
+    from src.domain.flight_events.sqlite import _BATCH_SIZE
+
+    events = [
+        {
+            "event_id": f"XX{i:05d}", "flight_number": f"XX{i:05d}", "from": "EZE", "to": "MIA",
+            "departure_time": "2025-02-01T08:00:00", "arrival_time": "2025-02-01T16:00:00",
+        }
+        for i in range(2 * _BATCH_SIZE + 10)
+    ]
+    data_path = tmp_path / "flight_events.json"
+    data_path.write_text(json.dumps(events))
+    db_path = str(tmp_path / "flight_events.db")
+    write_sqlite(FlightEventService(data_path=str(data_path)).snapshot(), db_path)
+
+    # Con carga, cada lote se pide desde otro thread del pool (todos vivos a la vez)
+    rows = FlightEventService(data_path=db_path, backend="sqlite").snapshot().iter_by_id()
+    pools = [ThreadPoolExecutor(max_workers=1) for _ in range(3)]
+    try:
+        batches = [
+            pool.submit(lambda: [e.event_id for e in islice(rows, _BATCH_SIZE)]).result() for pool in pools]
+    finally:
+        for pool in pools:
+            pool.shutdown()
+    assert [event_id for batch in batches for event_id in batch] == [e["event_id"] for e in events]
+
+    app = create_app()
+    app.state.flight_events_container.service.override(
+        providers.Singleton(FlightEventService, data_path=db_path, backend="sqlite"))
+    with TestClient(app) as client:
+        response = client.get("/flight-events", params={"format": "ndjson"})
+
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert len(lines) == len(events)
+    assert [json.loads(line)["flight_number"] for line in lines] == [e["flight_number"] for e in events]
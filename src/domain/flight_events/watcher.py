@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from typing import Optional, Tuple
+
+from .service import FlightEventService
+
+logger = logging.getLogger(__name__)
+
+
+class FlightEventsWatcher:
+    """Detecta cambios en la fuente de eventos (mtime/size) y dispara una recarga incremental."""
+
+    def __init__(self, service: FlightEventService, interval: float):
+        self._service = service
+        self._interval = interval
+        self._fingerprint: Optional[Tuple[int, int]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _current_fingerprint(self) -> Optional[Tuple[int, int]]:
+        return self._service.fingerprint()
+
+    def start(self) -> None:
+        if self._interval <= 0 or self._task is not None:
+            return
+        self._fingerprint = self._current_fingerprint()
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Watching {self._service.data_path} every {self._interval}s")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def check(self) -> bool:
+        fingerprint = self._current_fingerprint()
+        if fingerprint is None or fingerprint == self._fingerprint:
+            return False
+
+        # La lectura y el diff corren fuera del event loop
+        await asyncio.to_thread(self._service.reload)
+        self._fingerprint = fingerprint
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.check()
+            except Exception as e:
+                # Un archivo a medio escribir no debe tirar el watcher; se reintenta
+                logger.error(f"Error reloading flight events: {str(e)}")
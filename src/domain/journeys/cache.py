@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from src.domain.flight_events.service import FlightEventService
+from src.domain.flight_events.store import FlightEventStore
+from src.domain.flight_events.table import from_day
+
+
+class JourneySearchCache:
+    """Cache LRU con TTL de resultados de busqueda.
+
+    Las claves empiezan con la fecha buscada. Cada entrada guarda la version del store
+    con la que se calculo: ante una recarga solo se descartan las entradas cuyas fechas
+    leen buckets modificados (el dia buscado y el siguiente); el resto pasa a la nueva
+    version sin recalcularse.
+    """
+
+    def __init__(
+        self,
+        flight_event_service: FlightEventService,
+        max_size: int,
+        ttl: float,
+    ):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[int, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        flight_event_service.subscribe(self.invalidate)
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_size > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version or entry[1] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: Hashable, version: int, value: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self._ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, store: FlightEventStore) -> None:
+        """Descarta las entradas afectadas por un nuevo snapshot."""
+        with self._lock:
+            if store.changed_days is None:
+                self._entries.clear()
+                return
+
+            changed = {from_day(day) for day in store.changed_days}
+            for key in list(self._entries):
+                version, expires, value = self._entries[key]
+                flight_date: date = key[0]
+                if (flight_date in changed
+                        or flight_date + timedelta(days=1) in changed
+                        or version != store.version - 1):
+                    del self._entries[key]
+                else:
+                    self._entries[key] = (store.version, expires, value)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,613 @@
+import heapq
+import sys
+from bisect import bisect_left
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.domain.flight_events.store import FlightEventStore
+from src.domain.flight_events.table import MINUTES_PER_DAY
+from src.infrastructure.metrics.profiling import count, stage
+from src.infrastructure.metrics.registry import REGISTRY
+
+# Reglas de conexion, en minutos
+MAX_TOTAL_DURATION = 24 * 60
+MAX_CONNECTION_WAIT = 4 * 60
+# Busqueda inversa: el ultimo tramo llega en las 24hs previas a `arrive_by`
+ARRIVE_BY_WINDOW = 24 * 60
+
+_UNREACHABLE = sys.maxsize
+
+# (cantidad de tramos, duracion total en minutos, filas de cada tramo)
+FoundJourney = Tuple[int, int, Tuple[int, ...]]
+
+EVENTS_SCANNED = REGISTRY.counter(
+    "journey_search_events_scanned_total",
+    "Vuelos alcanzables recorridos por la primera pasada de la busqueda",
+)
+CANDIDATES_PRUNED = REGISTRY.counter(
+    "journey_search_candidates_pruned_total",
+    "Vuelos alcanzables descartados por duracion u horario antes de expandirlos",
+)
+
+
+class ConnectionScan:
+    """Busqueda de journeys multi-tramo sobre el grafo time-dependent de vuelos.
+
+    Cada vuelo es un nodo y hay una arista f1 -> f2 si f2 sale de la ciudad donde
+    aterriza f1 dentro de la ventana de conexion. El primer tramo sale el dia de la
+    busqueda (o dentro del rango `day`..`last_day`); los siguientes pueden salir ese
+    dia o el siguiente. La busqueda tiene tres pasadas:
+
+    1. Forward, en orden de horario de salida (estilo CSA): recorre solo los vuelos
+       alcanzables desde el origen con a lo sumo `max_legs` tramos, descartando los
+       que ya no pueden cumplir el limite de 24hs.
+    2. Backward, en orden inverso: calcula para cada vuelo y cantidad de tramos
+       restantes el arribo mas temprano posible al destino.
+    3. Enumeracion: arma los journeys desde el origen siguiendo solo aristas que
+       todavia pueden llegar al destino dentro de las reglas, por lo que el costo
+       depende de la cantidad de resultados y no de las combinaciones posibles.
+
+    Los filtros (`max_duration`, `depart_after`, `arrive_before`, en minutos desde
+    epoch) se aplican dentro de las tres pasadas. Con `limit` la enumeracion se hace
+    por cantidad de tramos y guarda solo los mejores `limit` journeys en un heap,
+    descartando las ramas cuyo arribo mas temprano ya no mejora al peor de ellos.
+    """
+
+    def __init__(
+        self,
+        store: FlightEventStore,
+        day: int,
+        max_legs: int,
+        last_day: Optional[int] = None,
+        max_duration: Optional[int] = None,
+        depart_after: Optional[int] = None,
+        arrive_before: Optional[int] = None,
+    ):
+        self._store = store
+        self._table = store.table
+        # Dias en los que puede salir el primer tramo (un solo dia salvo en busquedas por rango)
+        self._day = day
+        self._last_day = day if last_day is None else last_day
+        self._max_legs = max_legs
+        # La regla de 24hs aplica siempre; max_duration solo puede acotarla
+        self._max_duration = MAX_TOTAL_DURATION if max_duration is None else min(
+            max_duration, MAX_TOTAL_DURATION)
+        self._depart_after = depart_after
+        self._arrive_before = _UNREACHABLE if arrive_before is None else arrive_before
+        self._successors: Dict[int, List[int]] = {}
+
+    def _first_legs(self, origins: List[int]) -> List[int]:
+        # Los buckets estan ordenados por horario, concatenarlos por dia mantiene el orden
+        departure = self._table.departure
+        rows: List[int] = []
+        for origin in origins:
+            for day in range(self._day, self._last_day + 1):
+                bucket = self._store.departures(day, origin)
+                start = 0
+                if self._depart_after is not None:
+                    start = bisect_left(bucket.departure, self._depart_after)
+                rows.extend(bucket.rows[start:])
+        if len(origins) > 1:
+            rows.sort(key=departure.__getitem__)
+        return rows
+
+    def _next_flights(self, row: int) -> List[int]:
+        table = self._table
+        arrival = table.arrival[row]
+        city = table.to_city[row]
+        until = arrival + MAX_CONNECTION_WAIT
+
+        # La ventana de conexion puede cruzar la medianoche. Como el viaje dura
+        # menos de 24hs, alcanza con los buckets del dia de la busqueda y el siguiente.
+        first_day = max(self._day, arrival // MINUTES_PER_DAY)
+        last_day = min(self._last_day + 1, until // MINUTES_PER_DAY)
+
+        flights: List[int] = []
+        for day in range(first_day, last_day + 1):
+            bucket = self._store.departures(day, city)
+            flights.extend(bucket.rows[j] for j in bucket.window(arrival, until))
+        return flights
+
+    def search(self, origin: int, target: int, limit: Optional[int] = None) -> List[FoundJourney]:
+        return self.search_many([origin], [target], limit)[target]
+
+    def search_many(
+        self, origins: Iterable[int], targets: Iterable[int], limit: Optional[int] = None
+    ) -> Dict[int, List[FoundJourney]]:
+        """Busca desde uno o varios origenes hacia varios destinos en una sola pasada forward.
+
+        La pasada forward arranca a la vez desde las salidas de todos los origenes (por
+        ejemplo los aeropuertos de una ciudad), asi que los vuelos alcanzables y las
+        ventanas de conexion se calculan una sola vez; solo la pasada backward y la
+        enumeracion se hacen por destino. El resultado es el mismo que buscar cada par
+        por separado. Con `limit` se devuelven solo los primeros `limit` journeys por
+        (tramos, duracion) de cada destino.
+        """
+        origins = list(dict.fromkeys(origins))
+        targets = set(targets)
+        with stage("scan"):
+            first_legs = self._first_legs(origins)
+            scanned = self._scan_forward(origins, targets, first_legs)
+
+        found: Dict[int, List[FoundJourney]] = {}
+        for target in targets:
+            with stage("bounds"):
+                earliest = self._earliest(scanned, {target})
+            with stage("enumerate"):
+                found[target] = self._enumerate(target, first_legs, earliest, limit)
+        return found
+
+    def search_pareto(self, origins: Iterable[int], targets: Iterable[int]) -> List[FoundJourney]:
+        """Journeys no dominados por salida (mas tarde), llegada (mas temprano) y tramos.
+
+        Profile scan sobre las salidas del origen en orden de horario decreciente: para
+        cada salida y cantidad maxima de tramos, la pasada backward da una cota del
+        arribo mas temprano posible. Solo se busca un journey concreto cuando esa cota
+        mejora lo que ya se consiguio saliendo mas tarde con a lo sumo esos tramos, asi
+        que nunca se arman journeys dominados. Devuelve uno por cada combinacion
+        (salida, llegada, tramos) del frente.
+        """
+        origins = list(dict.fromkeys(origins))
+        targets = set(targets)
+        with stage("scan"):
+            first_legs = self._first_legs(origins)
+            scanned = self._scan_forward(origins, targets, first_legs)
+        with stage("bounds"):
+            earliest = self._earliest(scanned, targets)
+        with stage("enumerate"):
+            return self._profile_scan(first_legs, targets, earliest)
+
+    def _profile_scan(
+        self, first_legs: List[int], targets: Set[int], earliest: Dict[int, List[int]]
+    ) -> List[FoundJourney]:
+        departure = self._table.departure
+
+        # Mejor arribo conseguido por salidas posteriores, usando a lo sumo k tramos
+        best = [_UNREACHABLE] * (self._max_legs + 1)
+        found: List[FoundJourney] = []
+
+        for _, rows in groupby(reversed(first_legs), key=departure.__getitem__):
+            rows = list(rows)
+            for legs in range(1, self._max_legs + 1):
+                # Entre salidas simultaneas solo queda la que llega antes
+                winner = None
+                bound = best[legs]
+                for row in rows:
+                    path = self._fastest_path(row, legs, targets, earliest, bound)
+                    if path is not None:
+                        winner, bound = path, self._table.arrival[path[-1]]
+                if winner is None:
+                    continue
+
+                arrival = bound
+                found.append((len(winner), arrival - departure[winner[0]], winner))
+                for k in range(len(winner), self._max_legs + 1):
+                    best[k] = min(best[k], arrival)
+
+        # En orden de salida, como la busqueda completa (desempata igual al ordenar)
+        found.reverse()
+        return found
+
+    def _fastest_path(
+        self,
+        row: int,
+        legs: int,
+        targets: Set[int],
+        earliest: Dict[int, List[int]],
+        bound: int,
+    ) -> Optional[Tuple[int, ...]]:
+        """Journey de a lo sumo `legs` tramos que empieza en `row` y llega al destino lo
+        antes posible, si llega antes de `bound` (branch and bound guiado por `earliest`)."""
+        arrival = self._table.arrival
+        from_city = self._table.from_city
+        to_city = self._table.to_city
+        start = self._table.departure[row]
+        limit = min(start + self._max_duration, self._arrive_before)
+
+        reach = earliest.get(row)
+        if reach is None or reach[legs] >= bound or reach[legs] > limit:
+            return None
+
+        best_arrival = bound
+        best_path: Optional[Tuple[int, ...]] = None
+
+        def extend(path: List[int], visited: set) -> None:
+            nonlocal best_arrival, best_path
+            last = path[-1]
+            if to_city[last] in targets:
+                if arrival[last] < best_arrival:
+                    best_arrival, best_path = arrival[last], tuple(path)
+                return
+
+            legs_left = legs - len(path)
+            options = []
+            for nxt in self._successors.get(last, ()):
+                reach = earliest.get(nxt)
+                if reach is None or to_city[nxt] in visited or reach[legs_left] > limit:
+                    continue
+                options.append((reach[legs_left], nxt))
+
+            # Primero las ramas que pueden llegar antes; se corta cuando ya no mejoran
+            for bound_arrival, nxt in sorted(options):
+                if bound_arrival >= best_arrival:
+                    break
+                path.append(nxt)
+                visited.add(to_city[nxt])
+                extend(path, visited)
+                visited.discard(to_city[nxt])
+                path.pop()
+
+        extend([row], {from_city[row], to_city[row]})
+        return best_path
+
+    def _scan_forward(
+        self, origins: List[int], targets: Set[int], first_legs: List[int]
+    ) -> List[int]:
+        """Vuelos alcanzables desde los origenes, en orden de salida."""
+        table = self._table
+        departure = table.departure
+        arrival = table.arrival
+        to_city = table.to_city
+        max_legs = self._max_legs
+        max_duration = self._max_duration
+        arrive_before = self._arrive_before
+        # Con varios origenes un journey puede pasar por otro de ellos; la regla de no
+        # volver al propio origen la aplica la enumeracion
+        origin = origins[0] if len(origins) == 1 else None
+
+        level: Dict[int, int] = {row: 1 for row in first_legs}
+        latest_start: Dict[int, int] = {row: departure[row] for row in first_legs}
+        heap = [(departure[row], row) for row in first_legs]
+        heapq.heapify(heap)
+        scanned: List[int] = []
+
+        while heap:
+            _, row = heapq.heappop(heap)
+            # Los tramos siguientes solo pueden llegar mas tarde
+            if arrival[row] - latest_start[row] > max_duration or arrival[row] > arrive_before:
+                continue
+            scanned.append(row)
+
+            # Al llegar a un destino el journey termina, salvo que se busquen otros destinos
+            stop = to_city[row]
+            if level[row] == max_legs or (stop in targets and len(targets) == 1):
+                continue
+
+            successors = self._successors[row] = []
+            next_level = level[row] + 1
+            for nxt in self._next_flights(row):
+                # Volver al origen nunca forma parte de un journey valido
+                if to_city[nxt] == origin:
+                    continue
+                # En el ultimo tramo solo sirven los vuelos que llegan a un destino
+                if next_level == max_legs and to_city[nxt] not in targets:
+                    continue
+
+                successors.append(nxt)
+                if nxt not in level:
+                    level[nxt] = next_level
+                    latest_start[nxt] = latest_start[row]
+                    heapq.heappush(heap, (departure[nxt], nxt))
+                else:
+                    level[nxt] = min(level[nxt], next_level)
+                    latest_start[nxt] = max(latest_start[nxt], latest_start[row])
+
+        # Todo lo que entro al heap salio: lo que no se recorrio fue podado
+        count(EVENTS_SCANNED, len(scanned))
+        count(CANDIDATES_PRUNED, len(level) - len(scanned))
+        return scanned
+
+    def _earliest(self, scanned: List[int], targets: Set[int]) -> Dict[int, List[int]]:
+        """Backward: arribo mas temprano a un destino por cantidad de tramos restantes."""
+        arrival = self._table.arrival
+        to_city = self._table.to_city
+        max_legs = self._max_legs
+
+        earliest: Dict[int, List[int]] = {}
+        for row in reversed(scanned):
+            best = [_UNREACHABLE] * (max_legs + 1)
+            if to_city[row] in targets:
+                for k in range(1, max_legs + 1):
+                    best[k] = arrival[row]
+            else:
+                for nxt in self._successors.get(row, ()):
+                    reach = earliest.get(nxt)
+                    if reach is None:
+                        continue
+                    for k in range(2, max_legs + 1):
+                        if reach[k - 1] < best[k]:
+                            best[k] = reach[k - 1]
+            earliest[row] = best
+        return earliest
+
+    def _enumerate(
+        self,
+        target: int,
+        first_legs: List[int],
+        earliest: Dict[int, List[int]],
+        limit: Optional[int] = None,
+    ) -> List[FoundJourney]:
+        """Arma los journeys desde el origen, podando lo que no llega al destino."""
+        if limit is None:
+            return self._collect(target, first_legs, earliest)
+
+        # Top-K: el orden es por cantidad de tramos primero, asi que se enumera un nivel
+        # por vez y se corta apenas se juntan `limit` journeys
+        found: List[FoundJourney] = []
+        for legs in range(1, self._max_legs + 1):
+            found += self._collect(
+                target, first_legs, earliest, legs, limit - len(found))
+            if len(found) >= limit:
+                break
+        return found
+
+    def _collect(
+        self,
+        target: int,
+        first_legs: List[int],
+        earliest: Dict[int, List[int]],
+        legs: Optional[int] = None,
+        keep: Optional[int] = None,
+    ) -> List[FoundJourney]:
+        """DFS sobre los sucesores. Con `legs` solo arma journeys de exactamente esa
+        cantidad de tramos y con `keep` conserva solo los `keep` mas cortos."""
+        departure = self._table.departure
+        arrival = self._table.arrival
+        from_city = self._table.from_city
+        to_city = self._table.to_city
+        max_legs = self._max_legs if legs is None else legs
+        max_duration = self._max_duration
+        arrive_before = self._arrive_before
+
+        found: List[FoundJourney] = []
+        # Heap con el peor journey arriba: (-duracion, -orden de aparicion, journey).
+        # El orden de aparicion desempata igual que el sort estable de la busqueda completa
+        best: List[Tuple[int, int, FoundJourney]] = []
+        seen = 0
+
+        def feasible(row: int, legs_left: int, start: int) -> bool:
+            reach = earliest.get(row)
+            if reach is None:
+                return False
+            arrive = reach[legs_left]
+            if arrive - start > max_duration or arrive > arrive_before:
+                return False
+            # Ni llegando lo antes posible mejora al peor de los `keep` que ya tenemos
+            return keep is None or len(best) < keep or arrive - start < -best[0][0]
+
+        def extend(path: List[int], visited: set, start: int) -> None:
+            nonlocal seen
+            row = path[-1]
+            if to_city[row] == target:
+                if legs is not None and len(path) != legs:
+                    return
+                journey = (len(path), arrival[row] - start, tuple(path))
+                if keep is None:
+                    found.append(journey)
+                    return
+                seen += 1
+                heapq.heappush(best, (-journey[1], -seen, journey))
+                if len(best) > keep:
+                    heapq.heappop(best)
+                return
+
+            legs_left = max_legs - len(path)
+            for nxt in self._successors.get(row, ()):
+                if not feasible(nxt, legs_left, start):
+                    continue
+                if to_city[nxt] in visited:
+                    continue
+                path.append(nxt)
+                visited.add(to_city[nxt])
+                extend(path, visited, start)
+                visited.discard(to_city[nxt])
+                path.pop()
+
+        for row in first_legs:
+            if not feasible(row, max_legs, departure[row]):
+                continue
+            extend([row], {from_city[row], to_city[row]}, departure[row])
+
+        if keep is None:
+            return found
+        return [journey for _, _, journey in sorted(best, key=lambda b: (-b[0], -b[1]))]
+
+
+class ReverseConnectionScan:
+    """Busqueda inversa: journeys que llegan al destino a mas tardar a un horario.
+
+    Es el espejo de ConnectionScan sobre el indice por llegada del store: el ultimo
+    tramo llega entre `arrive_by - ARRIVE_BY_WINDOW` y `arrive_by` (del dia anterior o
+    del mismo) y los anteriores se buscan hacia atras entre los vuelos que llegan a la
+    ciudad de salida dentro de la ventana de conexion. Las tres pasadas son las mismas, invertidas en el tiempo:
+
+    1. Backward, en orden de llegada decreciente: recorre los vuelos que pueden
+       terminar en el destino con a lo sumo `max_legs` tramos.
+    2. Forward: para cada vuelo y cantidad de tramos restantes, la salida mas tardia
+       posible desde el origen.
+    3. Enumeracion desde el ultimo tramo, podando lo que no puede empezar en el origen
+       dentro de las 24hs.
+    """
+
+    def __init__(
+        self,
+        store: FlightEventStore,
+        max_legs: int,
+        arrive_by: int,
+        max_duration: Optional[int] = None,
+        depart_after: Optional[int] = None,
+    ):
+        self._store = store
+        self._table = store.table
+        self._max_legs = max_legs
+        self._arrive_by = arrive_by
+        self._max_duration = MAX_TOTAL_DURATION if max_duration is None else min(
+            max_duration, MAX_TOTAL_DURATION)
+        self._depart_after = -_UNREACHABLE if depart_after is None else depart_after
+        self._predecessors: Dict[int, List[int]] = {}
+
+    def _last_legs(self, target: int) -> List[int]:
+        since = self._arrive_by - ARRIVE_BY_WINDOW
+        rows: List[int] = []
+        for day in range(since // MINUTES_PER_DAY, self._arrive_by // MINUTES_PER_DAY + 1):
+            bucket = self._store.arrivals(day, target)
+            rows.extend(bucket.rows[j] for j in bucket.window(since, self._arrive_by + 1))
+        return rows
+
+    def _previous_flights(self, row: int) -> List[int]:
+        table = self._table
+        departure = table.departure[row]
+        city = table.from_city[row]
+        since = departure - MAX_CONNECTION_WAIT
+
+        # La espera es de a lo sumo 4hs: alcanza con las llegadas de uno o dos dias
+        first_day = since // MINUTES_PER_DAY
+        last_day = (departure - 1) // MINUTES_PER_DAY
+
+        flights: List[int] = []
+        for day in range(first_day, last_day + 1):
+            bucket = self._store.arrivals(day, city)
+            flights.extend(bucket.rows[j] for j in bucket.window(since, departure))
+        return flights
+
+    def search(self, origin: int, target: int) -> List[FoundJourney]:
+        return self.search_many([origin], target)[origin]
+
+    def search_many(self, origins: Iterable[int], target: int) -> Dict[int, List[FoundJourney]]:
+        """Busca desde varios origenes hacia un destino en una sola pasada backward.
+
+        Espejo de `ConnectionScan.search_many`: los vuelos que pueden terminar en el
+        destino y sus ventanas de conexion se calculan una sola vez; solo la pasada
+        forward y la enumeracion se hacen por origen. El resultado es el mismo que
+        buscar cada par por separado.
+        """
+        origins = list(dict.fromkeys(origins))
+        with stage("scan"):
+            last_legs = self._last_legs(target)
+            scanned = self._scan_backward(set(origins), target, last_legs)
+
+        found: Dict[int, List[FoundJourney]] = {}
+        for origin in origins:
+            with stage("bounds"):
+                latest = self._latest(scanned, origin)
+            with stage("enumerate"):
+                found[origin] = self._enumerate(origin, target, last_legs, latest)
+        return found
+
+    def _scan_backward(self, origins: Set[int], target: int, last_legs: List[int]) -> List[int]:
+        """Vuelos desde los que se puede llegar al destino, en orden de llegada decreciente."""
+        table = self._table
+        departure = table.departure
+        arrival = table.arrival
+        from_city = table.from_city
+        max_legs = self._max_legs
+        # Con varios origenes un journey puede pasar por otro de ellos
+        single_origin = len(origins) == 1
+
+        level: Dict[int, int] = {row: 1 for row in last_legs}
+        earliest_end: Dict[int, int] = {row: arrival[row] for row in last_legs}
+        heap = [(-arrival[row], row) for row in last_legs]
+        heapq.heapify(heap)
+        scanned: List[int] = []
+
+        while heap:
+            _, row = heapq.heappop(heap)
+            # Los tramos anteriores solo pueden salir mas temprano
+            if (earliest_end[row] - departure[row] > self._max_duration
+                    or departure[row] < self._depart_after):
+                continue
+            scanned.append(row)
+
+            # Al salir de un origen el journey empieza, salvo que se busquen otros origenes
+            if level[row] == max_legs or (single_origin and from_city[row] in origins):
+                continue
+
+            predecessors = self._predecessors[row] = []
+            next_level = level[row] + 1
+            for prv in self._previous_flights(row):
+                # Salir del destino para volver a el nunca forma parte de un journey valido
+                if from_city[prv] == target:
+                    continue
+                # En el primer tramo solo sirven los vuelos que salen de un origen
+                if next_level == max_legs and from_city[prv] not in origins:
+                    continue
+
+                predecessors.append(prv)
+                if prv not in level:
+                    level[prv] = next_level
+                    earliest_end[prv] = earliest_end[row]
+                    heapq.heappush(heap, (-arrival[prv], prv))
+                else:
+                    level[prv] = min(level[prv], next_level)
+                    earliest_end[prv] = min(earliest_end[prv], earliest_end[row])
+
+        count(EVENTS_SCANNED, len(scanned))
+        count(CANDIDATES_PRUNED, len(level) - len(scanned))
+        return scanned
+
+    def _latest(self, scanned: List[int], origin: int) -> Dict[int, List[int]]:
+        """Forward: salida mas tardia desde el origen por cantidad de tramos restantes."""
+        departure = self._table.departure
+        from_city = self._table.from_city
+        max_legs = self._max_legs
+
+        latest: Dict[int, List[int]] = {}
+        for row in reversed(scanned):
+            best = [-_UNREACHABLE] * (max_legs + 1)
+            if from_city[row] == origin:
+                for k in range(1, max_legs + 1):
+                    best[k] = departure[row]
+            else:
+                for prv in self._predecessors.get(row, ()):
+                    reach = latest.get(prv)
+                    if reach is None:
+                        continue
+                    for k in range(2, max_legs + 1):
+                        if reach[k - 1] > best[k]:
+                            best[k] = reach[k - 1]
+            latest[row] = best
+        return latest
+
+    def _enumerate(
+        self, origin: int, target: int, last_legs: List[int], latest: Dict[int, List[int]]
+    ) -> List[FoundJourney]:
+        """Arma los journeys desde el ultimo tramo hacia atras."""
+        departure = self._table.departure
+        arrival = self._table.arrival
+        from_city = self._table.from_city
+        max_legs = self._max_legs
+        max_duration = self._max_duration
+        depart_after = self._depart_after
+        found: List[FoundJourney] = []
+
+        def feasible(row: int, legs_left: int, end: int) -> bool:
+            reach = latest.get(row)
+            if reach is None:
+                return False
+            start = reach[legs_left]
+            return end - start <= max_duration and start >= depart_after
+
+        def extend(path: List[int], visited: set, end: int) -> None:
+            row = path[-1]
+            if from_city[row] == origin:
+                found.append((len(path), end - departure[row], tuple(reversed(path))))
+                return
+
+            legs_left = max_legs - len(path)
+            for prv in self._predecessors.get(row, ()):
+                if not feasible(prv, legs_left, end):
+                    continue
+                if from_city[prv] in visited:
+                    continue
+                path.append(prv)
+                visited.add(from_city[prv])
+                extend(path, visited, end)
+                visited.discard(from_city[prv])
+                path.pop()
+
+        for row in last_legs:
+            if not feasible(row, max_legs, arrival[row]):
+                continue
+            extend([row], {target, from_city[row]}, arrival[row])
+
+        return found
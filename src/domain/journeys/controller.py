@@ -1,11 +1,37 @@
-from datetime import datetime
-from typing import List
-from fastapi import APIRouter, Depends
+from datetime import date as Date, datetime, timezone
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from dependency_injector.wiring import inject, Provide
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from .service import JourneySearchService, JourneyDTO
+from .service import (
+    BATCH_SEARCH_LIMIT,
+    DEFAULT_MAX_CONNECTIONS,
+    MAX_CONNECTIONS_LIMIT,
+    RANGE_SEARCH_LIMIT_DAYS,
+    JourneyDayDTO,
+    JourneyDTO,
+    JourneySearchService,
+    SearchFilters,
+)
+from .connection_scan import MAX_TOTAL_DURATION
 from .module import JourneysModule
+from .serialization import journey_day_to_dict, journey_to_dict
+from src.infrastructure.concurrency.executor import ExecutorOverloadedError
+from src.infrastructure.http.pagination import (
+    PAGE_SIZE_LIMIT,
+    InvalidCursorError,
+    cursor_offset,
+    paginate,
+)
+from src.infrastructure.config.settings import settings
+from src.infrastructure.http.responses import (
+    conditional_headers,
+    json_response,
+    ndjson_response,
+    not_modified_response,
+)
+from src.infrastructure.metrics.profiling import stage
 
 router = APIRouter(prefix="/journeys", tags=["journeys"])
 
@@ -23,39 +49,239 @@ class Journey(BaseModel):
     path: List[JourneySegment]
 
 
+class JourneyDay(BaseModel):
+    date: Date
+    journeys: List[Journey]
+    shortest: Optional[Journey]
+    fewest_connections: Optional[Journey]
+
+
 class JourneySearchRequest(BaseModel):
     date: datetime
     from_city: str
     to_city: str
 
 
+class JourneyBatchSearchRequest(BaseModel):
+    queries: List[JourneySearchRequest] = Field(
+        min_length=1, max_length=BATCH_SEARCH_LIMIT)
+    max_connections: int = Field(
+        default=DEFAULT_MAX_CONNECTIONS, ge=1, le=MAX_CONNECTIONS_LIMIT)
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # El schedule guarda horarios naive en UTC: un valor con zona ("...Z", "-03:00")
+    # se pasa a UTC y se le quita la zona para poder compararlo
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _overloaded() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Search capacity exhausted, retry later",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.get("/search", response_model=List[Journey])
 @inject
 async def search_journeys(
+    request: Request,
     date: datetime,
     from_city: str,
     to_city: str,
+    max_connections: int = Query(
+        default=DEFAULT_MAX_CONNECTIONS,
+        ge=1,
+        le=MAX_CONNECTIONS_LIMIT,
+        description="Cantidad maxima de tramos por journey (1 = solo vuelos directos)",
+    ),
+    limit: Optional[int] = Query(
+        default=None,
+        ge=1,
+        le=PAGE_SIZE_LIMIT,
+        description=(
+            "Cantidad maxima de journeys (tamaño de pagina). "
+            "La busqueda solo calcula los necesarios para la pagina pedida"
+        ),
+    ),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Cursor devuelto en el header X-Next-Cursor de la pagina anterior",
+    ),
+    max_duration: Optional[int] = Query(
+        default=None,
+        ge=1,
+        le=MAX_TOTAL_DURATION,
+        description="Duracion maxima del journey en minutos",
+    ),
+    depart_after: Optional[datetime] = Query(
+        default=None, description="El primer tramo sale a partir de este horario"),
+    arrive_before: Optional[datetime] = Query(
+        default=None, description="El ultimo tramo llega a mas tardar a este horario"),
+    profile: Literal["all", "pareto"] = Query(
+        default="all",
+        description=(
+            "pareto: solo los journeys que ningun otro supera a la vez en horario de "
+            "salida (mas tarde), de llegada (mas temprano) y cantidad de tramos"
+        ),
+    ),
+    format: Literal["json", "ndjson"] = Query(
+        default="json",
+        description="ndjson: un journey por linea, enviado a medida que se serializa",
+    ),
     service: JourneySearchService = Depends(Provide[JourneysModule.service]),
 ) -> List[Journey]:
-    dtos: List[JourneyDTO] = service.search(
-        flight_date=date.date(),
-        from_city=from_city,
-        to_city=to_city,
-    )
+    # Un request repetido sobre el mismo schedule se responde sin llegar a la busqueda
+    caching = conditional_headers(request, service.data_revision(), settings.http_cache_max_age)
+    not_modified = not_modified_response(request, caching)
+    if not_modified is not None:
+        return not_modified
+
+    # El dia de busqueda es la fecha tal como la manda el cliente; solo los instantes se pasan a UTC
+    depart_after, arrive_before = _naive_utc(depart_after), _naive_utc(arrive_before)
+    try:
+        # Se piden los journeys hasta el final de la pagina y uno mas, para saber si hay otra;
+        # el cursor se valida contra la revision del snapshot sobre el que se busco
+        top = None if limit is None else cursor_offset(cursor) + limit + 1
+        dtos, revision = await service.search_with_revision_async(
+            flight_date=date.date(),
+            from_city=from_city,
+            to_city=to_city,
+            max_connections=max_connections,
+            filters=SearchFilters(
+                limit=top,
+                max_duration=max_duration,
+                depart_after=depart_after,
+                arrive_before=arrive_before,
+                pareto=profile == "pareto",
+            ),
+        )
+        page = paginate(len(dtos), revision, cursor, limit)
+    except ExecutorOverloadedError:
+        raise _overloaded()
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Los modelos pydantic solo documentan el schema: la respuesta se serializa
+    # directo desde los DTOs del servicio
+    dtos = dtos[page.start:page.stop]
+    headers = {**page.headers, **caching}
+    if format == "ndjson":
+        return ndjson_response(dtos, journey_to_dict, headers=headers)
+    with stage("serialize"):
+        return json_response([journey_to_dict(j) for j in dtos], headers=headers)
+
+
+@router.post("/search/batch", response_model=List[List[Journey]])
+@inject
+async def search_journeys_batch(
+    request: JourneyBatchSearchRequest,
+    service: JourneySearchService = Depends(Provide[JourneysModule.service]),
+) -> List[List[Journey]]:
+    """Varias busquedas en un request; la respuesta respeta el orden de `queries`."""
+    try:
+        results: List[List[JourneyDTO]] = await service.search_batch_async(
+            queries=[
+                (q.date.date(), q.from_city, q.to_city) for q in request.queries],
+            max_connections=request.max_connections,
+        )
+    except ExecutorOverloadedError:
+        raise _overloaded()
+
+    with stage("serialize"):
+        return json_response([[journey_to_dict(j) for j in dtos] for dtos in results])
 
-    return [
-        Journey(
-            connections=j.connections,
-            path=[
-                JourneySegment(
-                    flight_number=s.flight_number,
-                    from_city=s.from_city,
-                    to_city=s.to_city,
-                    departure_time=s.departure_time,
-                    arrival_time=s.arrival_time,
-                )
-                for s in j.path
-            ],
+
+@router.get("/search/arrive-by", response_model=List[Journey])
+@inject
+async def search_journeys_arrive_by(
+    request: Request,
+    arrive_by: datetime,
+    from_city: str,
+    to_city: str,
+    max_connections: int = Query(
+        default=DEFAULT_MAX_CONNECTIONS,
+        ge=1,
+        le=MAX_CONNECTIONS_LIMIT,
+        description="Cantidad maxima de tramos por journey (1 = solo vuelos directos)",
+    ),
+    limit: Optional[int] = Query(
+        default=None, ge=1, le=PAGE_SIZE_LIMIT, description="Cantidad maxima de journeys"),
+    max_duration: Optional[int] = Query(
+        default=None,
+        ge=1,
+        le=MAX_TOTAL_DURATION,
+        description="Duracion maxima del journey en minutos",
+    ),
+    depart_after: Optional[datetime] = Query(
+        default=None, description="El primer tramo sale a partir de este horario"),
+    service: JourneySearchService = Depends(Provide[JourneysModule.service]),
+) -> List[Journey]:
+    """Journeys que llegan al destino en las 24hs previas a `arrive_by`."""
+    caching = conditional_headers(request, service.data_revision(), settings.http_cache_max_age)
+    not_modified = not_modified_response(request, caching)
+    if not_modified is not None:
+        return not_modified
+
+    arrive_by, depart_after = _naive_utc(arrive_by), _naive_utc(depart_after)
+    try:
+        dtos: List[JourneyDTO] = await service.search_arrive_by_async(
+            arrive_by=arrive_by,
+            from_city=from_city,
+            to_city=to_city,
+            max_connections=max_connections,
+            filters=SearchFilters(
+                limit=limit, max_duration=max_duration, depart_after=depart_after),
         )
-        for j in dtos
-    ]
+    except ExecutorOverloadedError:
+        raise _overloaded()
+
+    with stage("serialize"):
+        return json_response([journey_to_dict(j) for j in dtos], headers=caching)
+
+
+@router.get("/search/range", response_model=List[JourneyDay])
+@inject
+async def search_journeys_range(
+    request: Request,
+    date_from: datetime,
+    date_to: datetime,
+    from_city: str,
+    to_city: str,
+    max_connections: int = Query(
+        default=DEFAULT_MAX_CONNECTIONS,
+        ge=1,
+        le=MAX_CONNECTIONS_LIMIT,
+        description="Cantidad maxima de tramos por journey (1 = solo vuelos directos)",
+    ),
+    service: JourneySearchService = Depends(Provide[JourneysModule.service]),
+) -> List[JourneyDay]:
+    """Journeys de cada dia del rango, con el mas corto y el de menos conexiones de cada dia."""
+    days = (date_to.date() - date_from.date()).days + 1
+    if days < 1 or days > RANGE_SEARCH_LIMIT_DAYS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"date_to must be within {RANGE_SEARCH_LIMIT_DAYS} days after date_from",
+        )
+
+    caching = conditional_headers(request, service.data_revision(), settings.http_cache_max_age)
+    not_modified = not_modified_response(request, caching)
+    if not_modified is not None:
+        return not_modified
+
+    try:
+        results: List[JourneyDayDTO] = await service.search_range_async(
+            date_from=date_from.date(),
+            date_to=date_to.date(),
+            from_city=from_city,
+            to_city=to_city,
+            max_connections=max_connections,
+        )
+    except ExecutorOverloadedError:
+        raise _overloaded()
+
+    with stage("serialize"):
+        return json_response([journey_day_to_dict(d) for d in results], headers=caching)
@@ -1,6 +1,10 @@
 from dependency_injector import containers, providers
-from .service import JourneySearchService
-from src.domain.flight_events.service import FlightEventService
+from src.infrastructure.config.settings import settings
+from .cache import JourneySearchCache
+from .route_table import RouteTable
+from src.infrastructure.concurrency.executor import BoundedExecutor
+from src.infrastructure.concurrency.singleflight import SingleFlight
+from .service import DEFAULT_MAX_CONNECTIONS, JourneySearchService, init_search_worker
 
 
 class JourneysModule(containers.DeclarativeContainer):
@@ -8,7 +12,55 @@ class JourneysModule(containers.DeclarativeContainer):
 
     root = providers.DependenciesContainer()
 
+    # Singleton: el cache de resultados se comparte entre todos los requests
+    cache = providers.Singleton(
+        JourneySearchCache,
+        flight_event_service=root.flight_event_service,
+        max_size=settings.journey_cache_size,
+        ttl=settings.journey_cache_ttl,
+    )
+
+    # Busqueda en vivo, sin cache: la usa el job que precalcula las rutas populares
+    live_search = providers.Factory(
+        JourneySearchService,
+        flight_event_service=root.flight_event_service,
+        city_groups=settings.city_group_map,
+    )
+
+    route_table = providers.Singleton(
+        RouteTable,
+        flight_event_service=root.flight_event_service,
+        searcher=live_search,
+        pairs=settings.route_table_pair_list,
+        horizon_days=settings.route_table_horizon_days,
+        refresh_interval=settings.route_table_refresh_interval,
+        max_connections=DEFAULT_MAX_CONNECTIONS,
+    )
+
+    # Pool donde corren las busquedas en vivo, fuera del event loop
+    executor = providers.Singleton(
+        BoundedExecutor,
+        kind=settings.search_executor,
+        max_workers=settings.search_executor_workers,
+        max_pending=settings.search_executor_max_pending,
+        # En modo "process" cada proceso carga su propio store
+        initializer=init_search_worker if settings.search_executor == "process" else None,
+        initargs=providers.List(
+            root.flight_event_service.provided.data_path,
+            settings.city_group_map,
+            root.flight_event_service.provided.backend,
+        ),
+    )
+
+    # Busquedas en vivo en curso, compartidas entre requests para no repetirlas
+    single_flight = providers.Singleton(SingleFlight)
+
     service = providers.Factory(
         JourneySearchService,
         flight_event_service=root.flight_event_service,
+        cache=cache,
+        route_table=route_table,
+        executor=executor,
+        city_groups=settings.city_group_map,
+        single_flight=single_flight,
     )
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from src.domain.flight_events.service import FlightEventService
+from src.domain.flight_events.store import FlightEventStore
+from src.domain.flight_events.table import from_day
+
+if TYPE_CHECKING:
+    from .service import JourneyDTO, JourneySearchService
+
+logger = logging.getLogger(__name__)
+
+RouteKey = Tuple[date, str, str]
+
+
+class RouteTable:
+    """Journeys precalculados para las rutas mas consultadas.
+
+    Un job en background (iniciado desde el lifespan) recalcula, para cada par de
+    ciudades configurado y cada dia del horizonte, la lista completa de journeys con
+    la misma logica que la busqueda en vivo. Los requests para esos pares se resuelven
+    con un lookup en un dict; el resto sigue yendo a la busqueda en vivo.
+    """
+
+    def __init__(
+        self,
+        flight_event_service: FlightEventService,
+        searcher: "JourneySearchService",
+        pairs: List[Tuple[str, str]],
+        horizon_days: int,
+        refresh_interval: float,
+        max_connections: int,
+    ):
+        self._flight_event_service = flight_event_service
+        self._searcher = searcher
+        self._pairs = pairs
+        self._horizon_days = horizon_days
+        self._refresh_interval = refresh_interval
+        self._max_connections = max_connections
+        self._entries: Dict[RouteKey, Tuple[int, List["JourneyDTO"]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        flight_event_service.subscribe(self.invalidate)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._pairs) and self._horizon_days > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(
+        self, flight_date: date, from_city: str, to_city: str, max_connections: int, version: int
+    ) -> Optional[List["JourneyDTO"]]:
+        if max_connections != self._max_connections:
+            return None
+        entry = self._entries.get((flight_date, from_city, to_city))
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def refresh(self, today: Optional[date] = None) -> None:
+        """Recalcula la tabla completa para el horizonte que empieza en `today`."""
+        today = today or date.today()
+        store = self._flight_event_service.snapshot()
+
+        entries: Dict[RouteKey, Tuple[int, List["JourneyDTO"]]] = {}
+        for offset in range(self._horizon_days):
+            flight_date = today + timedelta(days=offset)
+            for from_city, to_city in self._pairs:
+                journeys = self._searcher.search_snapshot(
+                    store, flight_date, from_city, to_city, self._max_connections)
+                entries[(flight_date, from_city, to_city)] = (store.version, journeys)
+
+        # Swap atomico: los lookups ven la tabla vieja o la nueva completa
+        self._entries = entries
+        logger.info(
+            f"Route table refreshed: {len(entries)} entries (version {store.version})")
+
+    def invalidate(self, store: FlightEventStore) -> None:
+        """Descarta las entradas que leen dias modificados; el proximo refresh las recalcula."""
+        changed = None if store.changed_days is None else {
+            from_day(day) for day in store.changed_days}
+
+        entries = {}
+        for key, (version, journeys) in self._entries.items():
+            flight_date = key[0]
+            if (changed is None
+                    or flight_date in changed
+                    or flight_date + timedelta(days=1) in changed
+                    or version != store.version - 1):
+                continue
+            entries[key] = (store.version, journeys)
+        self._entries = entries
+
+    def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # El calculo corre fuera del event loop, sin bloquear requests
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                logger.error(f"Error refreshing route table: {str(e)}")
+            await asyncio.sleep(self._refresh_interval)
@@ -0,0 +1,29 @@
+from .service import JourneyDayDTO, JourneyDTO, JourneySegmentDTO
+
+
+def segment_to_dict(segment: JourneySegmentDTO) -> dict:
+    return {
+        "flight_number": segment.flight_number,
+        "from_city": segment.from_city,
+        "to_city": segment.to_city,
+        "departure_time": segment.departure_time,
+        "arrival_time": segment.arrival_time,
+    }
+
+
+def journey_to_dict(journey: JourneyDTO) -> dict:
+    """Mismos campos que el modelo `Journey` del controller, sin pasar por pydantic."""
+    return {
+        "connections": journey.connections,
+        "path": [segment_to_dict(s) for s in journey.path],
+    }
+
+
+def journey_day_to_dict(day: JourneyDayDTO) -> dict:
+    return {
+        "date": day.date,
+        "journeys": [journey_to_dict(j) for j in day.journeys],
+        "shortest": journey_to_dict(day.shortest) if day.shortest else None,
+        "fewest_connections": (
+            journey_to_dict(day.fewest_connections) if day.fewest_connections else None),
+    }
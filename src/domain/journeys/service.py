@@ -1,13 +1,91 @@
 from datetime import date, datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, NamedTuple, Optional, Tuple
 import logging
 
-from src.domain.flight_events.service import FlightEventService, FlightEventDTO
+from src.domain.flight_events.repository import FlightEventBackend
+from src.domain.flight_events.service import FlightEventService
+from src.domain.flight_events.store import FlightEventStore
+from src.domain.flight_events.table import (
+    MINUTES_PER_DAY,
+    FlightEventTable,
+    from_day,
+    from_minutes,
+    to_day,
+    to_minutes,
+)
+from src.infrastructure.concurrency.executor import BoundedExecutor
+from src.infrastructure.concurrency.singleflight import SingleFlight
+from src.infrastructure.metrics.profiling import count, stage
+from src.infrastructure.metrics.registry import REGISTRY
+from .cache import JourneySearchCache
+from .connection_scan import ConnectionScan, FoundJourney, ReverseConnectionScan
+from .route_table import RouteTable
 
 logger = logging.getLogger(__name__)
 
+# Por defecto: vuelos directos o con una escala
+DEFAULT_MAX_CONNECTIONS = 2
+MAX_CONNECTIONS_LIMIT = 4
+
+# Cantidad maxima de busquedas por request en /journeys/search/batch
+BATCH_SEARCH_LIMIT = 100
+
+# Cantidad maxima de dias en /journeys/search/range
+RANGE_SEARCH_LIMIT_DAYS = 31
+
+JOURNEYS_EMITTED = REGISTRY.counter(
+    "journey_search_journeys_emitted_total",
+    "Journeys devueltos por las busquedas en vivo",
+)
+LOOKUPS = REGISTRY.counter(
+    "journey_search_lookups_total",
+    "Busquedas resueltas por la tabla de rutas o el cache (hit), calculadas en vivo (miss) "
+    "o sumadas a una busqueda identica en curso (coalesced)",
+    labelnames=("result",),
+)
+
+
+class SearchFilters(NamedTuple):
+    """Filtros que se aplican dentro de la busqueda en lugar de sobre el resultado."""
+
+    # Cantidad maxima de journeys, en el orden de la respuesta (tramos, duracion)
+    limit: Optional[int] = None
+    # Duracion maxima del journey en minutos (nunca mas de 24hs)
+    max_duration: Optional[int] = None
+    depart_after: Optional[datetime] = None
+    arrive_before: Optional[datetime] = None
+    # Solo los journeys no dominados por salida, llegada y cantidad de tramos
+    pareto: bool = False
+
+    def matches(self, journey: "JourneyDTO") -> bool:
+        first, last = journey.path[0], journey.path[-1]
+        if self.depart_after is not None and first.departure_time < self.depart_after:
+            return False
+        if self.arrive_before is not None and last.arrival_time > self.arrive_before:
+            return False
+        return self.max_duration is None or (
+            last.arrival_time - first.departure_time <= timedelta(minutes=self.max_duration))
+
+    def apply(self, journeys: List["JourneyDTO"]) -> List["JourneyDTO"]:
+        """Mismo resultado que buscar con los filtros, a partir de la lista completa."""
+        if self != NO_FILTERS:
+            journeys = [j for j in journeys if self.matches(j)]
+            if self.pareto:
+                journeys = _pareto_front(journeys)
+            journeys = journeys[:self.limit]
+        return journeys
+
+
+NO_FILTERS = SearchFilters()
+
+# (fecha, origen, destino, max_connections, filtros)
+SearchKey = Tuple[date, str, str, int, SearchFilters]
+
 
 class JourneySegmentDTO:
+    __slots__ = ("flight_number", "from_city", "to_city",
+                 "departure_time", "arrival_time")
+
     def __init__(
         self,
         flight_number: str,
@@ -24,97 +102,506 @@ class JourneySegmentDTO:
 
 
 class JourneyDTO:
+    __slots__ = ("connections", "path")
+
     def __init__(self, connections: int, path: List[JourneySegmentDTO]):
         self.connections = connections
         self.path = path
 
 
-class JourneySearchService:
-    def __init__(self, flight_event_service: FlightEventService):
-        self._flight_event_service = flight_event_service
+class JourneyDayDTO:
+    __slots__ = ("date", "journeys", "shortest", "fewest_connections")
+
+    def __init__(
+        self,
+        date: date,
+        journeys: List[JourneyDTO],
+        shortest: Optional[JourneyDTO],
+        fewest_connections: Optional[JourneyDTO],
+    ):
+        self.date = date
+        self.journeys = journeys
+        self.shortest = shortest
+        self.fewest_connections = fewest_connections
+
 
-    def search(self, flight_date: date, from_city: str, to_city: str) -> List[JourneyDTO]:
-        max_total_duration = timedelta(hours=24)
-        max_connection_wait = timedelta(hours=4)
-        journeys: List[JourneyDTO] = []
-        all_events: List[FlightEventDTO] = self._flight_event_service.list_all()
-        flights = [e for e in all_events if e.departure_time.date()
-                   == flight_date]
-
-        flights_by_origin: Dict[str, List[FlightEventDTO]] = {}
-        for f in flights:
-            flights_by_origin.setdefault(f.from_city, []).append(f)
-
-        first_part = flights_by_origin.get(from_city, [])
-
-        for f1 in first_part:
-            # Caso 1: Vuelo directo
-            if f1.to_city == to_city:
-                journeys.append(
-                    JourneyDTO(
-                        connections=1,
-                        path=[
-                            JourneySegmentDTO(
-                                flight_number=f1.flight_number,
-                                from_city=f1.from_city,
-                                to_city=f1.to_city,
-                                departure_time=f1.departure_time,
-                                arrival_time=f1.arrival_time,
-                            )
-                        ],
-                    )
-                )
-
-            # Caso 2: Vuelos con escala
-            second_part = flights_by_origin.get(f1.to_city, [])
-
-            for f2 in second_part:
-                # No va a donde quiero llegar
-                if f2.to_city != to_city:
-                    continue
-
-                # Ya salio cuando yo llegue a la escala
-                if f2.departure_time <= f1.arrival_time:
-                    continue
-
-                # Hay que esperar mas de 4hs entre vuelos
-                connection_wait = f2.departure_time - f1.arrival_time
-                if connection_wait > max_connection_wait:
-                    continue
-
-                # La duracion total del viaje es mayor a 24hs
-                total_duration = f2.arrival_time - f1.departure_time
-                if total_duration > max_total_duration:
-                    continue
-
-                journeys.append(
-                    JourneyDTO(
-                        connections=2,
-                        path=[
-                            JourneySegmentDTO(
-                                flight_number=f1.flight_number,
-                                from_city=f1.from_city,
-                                to_city=f1.to_city,
-                                departure_time=f1.departure_time,
-                                arrival_time=f1.arrival_time,
-                            ),
-                            JourneySegmentDTO(
-                                flight_number=f2.flight_number,
-                                from_city=f2.from_city,
-                                to_city=f2.to_city,
-                                departure_time=f2.departure_time,
-                                arrival_time=f2.arrival_time,
-                            ),
-                        ],
-                    )
-                )
+def _segment(table: FlightEventTable, row: int) -> JourneySegmentDTO:
+    return JourneySegmentDTO(
+        flight_number=table.flight_numbers[table.flight_number[row]],
+        from_city=table.cities[table.from_city[row]],
+        to_city=table.cities[table.to_city[row]],
+        departure_time=from_minutes(table.departure[row]),
+        arrival_time=from_minutes(table.arrival[row]),
+    )
 
+
+def _journeys(
+    table: FlightEventTable, found: List[FoundJourney], limit: Optional[int] = None
+) -> List[JourneyDTO]:
+    with stage("build"):
         # Ordenamos primero por cantidad de conexiones y segundo por duracion total del viaje
-        journeys.sort(
-            key=lambda j: (
-                j.connections,
-                j.path[-1].arrival_time - j.path[0].departure_time,
+        found.sort(key=lambda f: (f[0], f[1]))
+
+        journeys = [
+            JourneyDTO(
+                connections=connections,
+                path=[_segment(table, row) for row in rows],
             )
-        )
+            for connections, _, rows in found[:limit]
+        ]
+    count(JOURNEYS_EMITTED, len(journeys))
+    return journeys
+
+
+class JourneySearchService:
+    def __init__(
+        self,
+        flight_event_service: FlightEventService,
+        cache: Optional[JourneySearchCache] = None,
+        route_table: Optional[RouteTable] = None,
+        executor: Optional[BoundedExecutor] = None,
+        city_groups: Optional[Dict[str, List[str]]] = None,
+        single_flight: Optional[SingleFlight] = None,
+    ):
+        self._flight_event_service = flight_event_service
+        self._cache = cache
+        self._route_table = route_table
+        self._executor = executor
+        # Busquedas en vivo en curso: las identicas que llegan mientras tanto las esperan
+        self._single_flight = single_flight
+        # Codigos de ciudad o metro (LON, NYC) -> aeropuertos; se buscan en una sola pasada
+        self._city_groups = city_groups or {}
+
+    def data_revision(self) -> str:
+        """Revision de los datos publicados, igual en todos los workers (para ETags)."""
+        return self._flight_event_service.revision()
 
+    def search(
+        self,
+        flight_date: date,
+        from_city: str,
+        to_city: str,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        filters: SearchFilters = NO_FILTERS,
+    ) -> List[JourneyDTO]:
+        """Busca journeys de hasta `max_connections` tramos (1 = solo vuelos directos)."""
+        queries = [(flight_date, from_city, to_city)]
+        return self.search_batch(queries, max_connections, filters)[0]
+
+    async def search_async(
+        self,
+        flight_date: date,
+        from_city: str,
+        to_city: str,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        filters: SearchFilters = NO_FILTERS,
+    ) -> List[JourneyDTO]:
+        """Igual que `search`, pero la busqueda en vivo corre en el pool de busqueda.
+
+        Los lookups en la tabla de rutas y el cache se resuelven en el event loop;
+        solo el calculo se manda al executor. Si su cola esta llena se propaga
+        ExecutorOverloadedError.
+        """
+        journeys, _ = await self.search_with_revision_async(
+            flight_date, from_city, to_city, max_connections, filters)
         return journeys
+
+    async def search_with_revision_async(
+        self,
+        flight_date: date,
+        from_city: str,
+        to_city: str,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        filters: SearchFilters = NO_FILTERS,
+    ) -> Tuple[List[JourneyDTO], str]:
+        """Igual que `search_async`, con la revision del snapshot sobre el que se busco (para cursores)."""
+        store, revision = self._flight_event_service.published()
+        queries = [(flight_date, from_city, to_city)]
+        return (await self._search_batch_async(store, queries, max_connections, filters))[0], revision
+
+    def search_batch(
+        self,
+        queries: List[Tuple[date, str, str]],
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        filters: SearchFilters = NO_FILTERS,
+    ) -> List[List[JourneyDTO]]:
+        """Resuelve varias busquedas `(fecha, origen, destino)` y devuelve los resultados en orden."""
+        store = self._flight_event_service.snapshot()
+        keys = [(*query, max_connections, filters) for query in queries]
+
+        results, misses = self._resolve(store, keys)
+        if misses:
+            LOOKUPS.inc(len(misses), ("miss",))
+            results.update(self._remember(
+                store, self.search_snapshot_many(store, misses)))
+        return [list(results[key]) for key in keys]
+
+    async def search_batch_async(
+        self,
+        queries: List[Tuple[date, str, str]],
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        filters: SearchFilters = NO_FILTERS,
+    ) -> List[List[JourneyDTO]]:
+        """Igual que `search_batch`; todas las busquedas en vivo van juntas al executor."""
+        store = self._flight_event_service.snapshot()
+        return await self._search_batch_async(store, queries, max_connections, filters)
+
+    async def _search_batch_async(
+        self,
+        store: FlightEventStore,
+        queries: List[Tuple[date, str, str]],
+        max_connections: int,
+        filters: SearchFilters,
+    ) -> List[List[JourneyDTO]]:
+        keys = [(*query, max_connections, filters) for query in queries]
+
+        results, misses = self._resolve(store, keys)
+        if misses:
+            results.update(await self._compute(store, misses))
+        return [list(results[key]) for key in keys]
+
+    async def _compute(
+        self, store: FlightEventStore, misses: List[SearchKey]
+    ) -> Dict[SearchKey, List[JourneyDTO]]:
+        """Busqueda en vivo de las claves que no estan en cache.
+
+        Con single-flight, una clave que ya se esta calculando sobre la misma version
+        del schedule no se vuelve a calcular: se espera el resultado en curso. El
+        calculo guarda en el cache antes de liberar la clave, asi que los requests
+        que llegan despues lo encuentran ahi.
+        """
+        async def compute(keys: List[SearchKey]) -> Dict[SearchKey, List[JourneyDTO]]:
+            return self._remember(store, await self._offload(store, "search_snapshot_many", keys))
+
+        if self._single_flight is None:
+            LOOKUPS.inc(len(misses), ("miss",))
+            return await compute(misses)
+
+        flights = [(store.version, key) for key in misses]
+        coalesced = sum(1 for flight in flights if flight in self._single_flight)
+        LOOKUPS.inc(len(misses) - coalesced, ("miss",))
+        LOOKUPS.inc(coalesced, ("coalesced",))
+
+        async def compute_flights(new: List[Tuple[int, SearchKey]]):
+            computed = await compute([key for _, key in new])
+            return {(version, key): computed[key] for version, key in new}
+
+        computed = await self._single_flight.run_many(flights, compute_flights)
+        return {key: computed[(store.version, key)] for key in misses}
+
+    async def _offload(self, store: FlightEventStore, method: str, *args):
+        """Corre un metodo `*_snapshot` en el pool de busqueda (o inline si no hay pool).
+
+        En modo "process" se le pasa al worker solo la revision de los datos: cada
+        proceso busca sobre su propio store y lo recarga si quedo atras.
+        """
+        if self._executor is None:
+            return getattr(self, method)(store, *args)
+        # Incluye la espera en la cola del pool; en modo "thread" las etapas de la
+        # busqueda se registran ademas por separado
+        with stage("executor"):
+            if self._executor.kind == "process":
+                revision = self._flight_event_service.revision()
+                return await self._executor.run(run_in_worker, revision, method, *args)
+            return await self._executor.run(getattr(self, method), store, *args)
+
+    def _resolve(
+        self, store: FlightEventStore, keys: List[SearchKey]
+    ) -> Tuple[Dict[SearchKey, List[JourneyDTO]], List[SearchKey]]:
+        """Separa las busquedas ya resueltas (tabla de rutas o cache) de las que hay que calcular."""
+        results: Dict[SearchKey, List[JourneyDTO]] = {}
+        misses: List[SearchKey] = []
+
+        with stage("lookup"):
+            for key in dict.fromkeys(keys):
+                journeys = self._lookup(store, key)
+                if journeys is None:
+                    misses.append(key)
+                else:
+                    results[key] = journeys
+        LOOKUPS.inc(len(results), ("hit",))
+        return results, misses
+
+    def _lookup(self, store: FlightEventStore, key: SearchKey) -> Optional[List[JourneyDTO]]:
+        # Rutas populares: resultado precalculado en background, filtrado si hace falta
+        if self._route_table is not None:
+            flight_date, from_city, to_city, max_connections, filters = key
+            precomputed = self._route_table.lookup(
+                flight_date, from_city, to_city, max_connections, store.version)
+            if precomputed is not None:
+                return filters.apply(precomputed)
+
+        if self._cache is not None:
+            return self._cache.get(key, store.version)
+        return None
+
+    def _remember(
+        self, store: FlightEventStore, computed: Dict[SearchKey, List[JourneyDTO]]
+    ) -> Dict[SearchKey, List[JourneyDTO]]:
+        if self._cache is not None:
+            for key, journeys in computed.items():
+                self._cache.put(key, store.version, journeys)
+        return computed
+
+    def _airports(self, store: FlightEventStore, code: str) -> List[int]:
+        """Ids de los aeropuertos de un codigo: una ciudad o un grupo (por ejemplo LON)."""
+        cities = self._city_groups.get(code, (code,))
+        return [city for city in map(store.city_id, cities) if city is not None]
+
+    def _targets(self, store: FlightEventStore, origins: List[int], code: str) -> List[int]:
+        # Un destino solo se descarta si es el unico origen: con grupos, LHR es un destino
+        # valido desde LGW aunque ambos sean aeropuertos de LON
+        return [city for city in self._airports(store, code) if [city] != origins]
+
+    def search_snapshot(
+        self,
+        store: FlightEventStore,
+        flight_date: date,
+        from_city: str,
+        to_city: str,
+        max_connections: int,
+    ) -> List[JourneyDTO]:
+        """Busqueda en vivo sobre un snapshot puntual, sin pasar por cache ni tabla de rutas."""
+        key = (flight_date, from_city, to_city, max_connections, NO_FILTERS)
+        return self.search_snapshot_many(store, [key])[key]
+
+    def search_snapshot_many(
+        self, store: FlightEventStore, keys: List[SearchKey]
+    ) -> Dict[SearchKey, List[JourneyDTO]]:
+        """Busqueda en vivo de varias claves, agrupadas por fecha, origen y filtros.
+
+        Cada grupo hace una sola pasada forward sobre el indice, compartida entre
+        todos sus destinos.
+        """
+        table = store.table
+        groups: Dict[Tuple[date, str, int, SearchFilters], List[str]] = {}
+        for flight_date, from_city, to_city, max_connections, filters in keys:
+            groups.setdefault(
+                (flight_date, from_city, max_connections, filters), []).append(to_city)
+
+        results: Dict[SearchKey, List[JourneyDTO]] = {}
+        for (flight_date, from_city, max_connections, filters), to_cities in groups.items():
+            origins = self._airports(store, from_city)
+            targets = {to_city: self._targets(store, origins, to_city) for to_city in to_cities}
+
+            found_by_target: Dict[int, List[FoundJourney]] = {}
+            if origins and any(targets.values()) and not filters.pareto:
+                scan = _forward_scan(store, flight_date, max_connections, filters)
+                found_by_target = scan.search_many(
+                    origins, {t for ids in targets.values() for t in ids}, filters.limit)
+
+            for to_city in to_cities:
+                if filters.pareto:
+                    # El frente se calcula sobre todos los aeropuertos del destino juntos.
+                    # Un scan por destino: sus pasadas guardan estado que depende de los destinos
+                    found = []
+                    if origins and targets[to_city]:
+                        scan = _forward_scan(store, flight_date, max_connections, filters)
+                        found = scan.search_pareto(origins, targets[to_city])
+                else:
+                    found = [f for t in targets[to_city] for f in found_by_target[t]]
+                results[(flight_date, from_city, to_city, max_connections, filters)] = _journeys(
+                    table, found, filters.limit)
+
+        return results
+
+    def search_range(
+        self,
+        date_from: date,
+        date_to: date,
+        from_city: str,
+        to_city: str,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    ) -> List[JourneyDayDTO]:
+        """Journeys para cada dia de `date_from` a `date_to` (inclusive), agrupados por dia."""
+        store = self._flight_event_service.snapshot()
+        return self.search_range_snapshot(
+            store, date_from, date_to, from_city, to_city, max_connections)
+
+    async def search_range_async(
+        self,
+        date_from: date,
+        date_to: date,
+        from_city: str,
+        to_city: str,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    ) -> List[JourneyDayDTO]:
+        store = self._flight_event_service.snapshot()
+        return await self._offload(
+            store, "search_range_snapshot", date_from, date_to, from_city, to_city, max_connections)
+
+    def search_range_snapshot(
+        self,
+        store: FlightEventStore,
+        date_from: date,
+        date_to: date,
+        from_city: str,
+        to_city: str,
+        max_connections: int,
+    ) -> List[JourneyDayDTO]:
+        """Busqueda por rango en una sola pasada.
+
+        Las salidas del origen de todo el rango se recorren en un unico barrido ordenado
+        y los journeys se agrupan despues por el dia de salida del primer tramo.
+        """
+        table = store.table
+        first_day, last_day = to_day(date_from), to_day(date_to)
+
+        found_by_day: Dict[int, List[FoundJourney]] = {
+            day: [] for day in range(first_day, last_day + 1)}
+
+        origins = self._airports(store, from_city)
+        targets = self._targets(store, origins, to_city)
+        if origins and targets:
+            scan = ConnectionScan(store, first_day, max_connections, last_day=last_day)
+            for found_by_target in scan.search_many(origins, targets).values():
+                for found in found_by_target:
+                    found_by_day[table.departure[found[2][0]] // MINUTES_PER_DAY].append(found)
+
+        days: List[JourneyDayDTO] = []
+        for day, found in found_by_day.items():
+            journeys = _journeys(table, found)
+            days.append(JourneyDayDTO(
+                date=from_day(day),
+                journeys=journeys,
+                shortest=min(journeys, key=_duration, default=None),
+                fewest_connections=journeys[0] if journeys else None,
+            ))
+        return days
+
+    def search_arrive_by(
+        self,
+        arrive_by: datetime,
+        from_city: str,
+        to_city: str,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        filters: SearchFilters = NO_FILTERS,
+    ) -> List[JourneyDTO]:
+        """Journeys cuyo ultimo tramo llega en las 24hs previas a `arrive_by`."""
+        store = self._flight_event_service.snapshot()
+        return self.search_arrive_by_snapshot(
+            store, arrive_by, from_city, to_city, max_connections, filters)
+
+    async def search_arrive_by_async(
+        self,
+        arrive_by: datetime,
+        from_city: str,
+        to_city: str,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        filters: SearchFilters = NO_FILTERS,
+    ) -> List[JourneyDTO]:
+        store = self._flight_event_service.snapshot()
+        return await self._offload(
+            store, "search_arrive_by_snapshot", arrive_by, from_city, to_city, max_connections, filters)
+
+    def search_arrive_by_snapshot(
+        self,
+        store: FlightEventStore,
+        arrive_by: datetime,
+        from_city: str,
+        to_city: str,
+        max_connections: int,
+        filters: SearchFilters = NO_FILTERS,
+    ) -> List[JourneyDTO]:
+        """Busqueda inversa sobre el indice por llegada, con las mismas reglas de 4hs/24hs.
+
+        El horario limite es `arrive_by`; de los filtros se usan `limit`, `max_duration`
+        y `depart_after`.
+        """
+        origins = self._airports(store, from_city)
+        targets = self._targets(store, origins, to_city)
+
+        # Una pasada backward por destino, compartida por todos los origenes
+        found: List[FoundJourney] = []
+        for target in targets:
+            scan = ReverseConnectionScan(
+                store,
+                max_connections,
+                to_minutes(arrive_by),
+                max_duration=filters.max_duration,
+                depart_after=_minutes(filters.depart_after),
+            )
+            for journeys in scan.search_many(
+                    [origin for origin in origins if origin != target], target).values():
+                found += journeys
+
+        return _journeys(store.table, found, filters.limit)
+
+
+def _pareto_front(journeys: List[JourneyDTO]) -> List[JourneyDTO]:
+    """Filtra una lista ya calculada: mismo resultado que `ConnectionScan.search_pareto`."""
+    def departure(j: JourneyDTO) -> datetime:
+        return j.path[0].departure_time
+
+    def arrival(j: JourneyDTO) -> datetime:
+        return j.path[-1].arrival_time
+
+    # Quien domina a un journey siempre aparece antes en este orden
+    ordered = sorted(journeys, key=lambda j: (-to_minutes(departure(j)), j.connections, arrival(j)))
+    front = set()
+    best: Dict[int, datetime] = {}
+    for j in ordered:
+        if any(arrival(j) >= a for legs, a in best.items() if legs <= j.connections):
+            continue
+        front.add(id(j))
+        best[j.connections] = min(best.get(j.connections, arrival(j)), arrival(j))
+    return [j for j in journeys if id(j) in front]
+
+
+def _forward_scan(
+    store: FlightEventStore, flight_date: date, max_connections: int, filters: SearchFilters
+) -> ConnectionScan:
+    return ConnectionScan(
+        store,
+        to_day(flight_date),
+        max_connections,
+        max_duration=filters.max_duration,
+        depart_after=_minutes(filters.depart_after),
+        arrive_before=_minutes(filters.arrive_before),
+    )
+
+
+def _minutes(value: Optional[datetime]) -> Optional[int]:
+    return None if value is None else to_minutes(value)
+
+
+def _duration(journey: JourneyDTO):
+    return journey.path[-1].arrival_time - journey.path[0].departure_time
+
+
+# ---------------------------------------------------------------------------
+# Pool de procesos: cada proceso mantiene su propio store
+# ---------------------------------------------------------------------------
+
+_worker_service: Optional[JourneySearchService] = None
+# Ultima revision del proceso principal con la que se sincronizo este worker
+_worker_synced: Optional[str] = None
+
+
+def init_search_worker(
+    data_path: str,
+    city_groups: Optional[Dict[str, List[str]]] = None,
+    backend: FlightEventBackend = "file",
+) -> None:
+    global _worker_service
+    _worker_service = JourneySearchService(
+        FlightEventService(data_path, backend=backend), city_groups=city_groups)
+    _worker_service._flight_event_service.load()
+
+
+def run_in_worker(revision: str, method: str, *args):
+    """Ejecuta un metodo `*_snapshot` del servicio del proceso sobre su store."""
+    global _worker_synced
+    flight_event_service = _worker_service._flight_event_service
+
+    # Las versiones son propias de cada proceso; la revision sale del fingerprint de la
+    # fuente y coincide entre procesos. Si difiere (el worker cargo antes de una recarga
+    # del principal, incluso en su primera tarea) se pone al dia antes de buscar. Se
+    # compara una vez por revision: si el worker ya tiene datos mas nuevos que el
+    # principal, reload no encuentra cambios y no se vuelve a intentar.
+    if revision != _worker_synced:
+        if flight_event_service.revision() != revision:
+            flight_event_service.reload()
+        _worker_synced = revision
+
+    return getattr(_worker_service, method)(flight_event_service.snapshot(), *args)
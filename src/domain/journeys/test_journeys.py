@@ -1,7 +1,31 @@
+import asyncio
+import json
+import threading
 from datetime import date, datetime, timedelta
-from typing import List
-
-from src.domain.journeys.service import JourneySearchService
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from src.domain.flight_events.service import FlightEventService
+from src.domain.flight_events.sqlite import write_sqlite
+from src.domain.flight_events.store import FlightEventStore
+from src.domain.journeys.cache import JourneySearchCache
+from src.domain.journeys.route_table import RouteTable
+from src.domain.journeys.serialization import journey_day_to_dict, journey_to_dict
+from src.domain.journeys.service import (
+    JOURNEYS_EMITTED,
+    JourneySearchService,
+    SearchFilters,
+    init_search_worker,
+)
+from src.infrastructure.concurrency.executor import BoundedExecutor, ExecutorOverloadedError
+from src.infrastructure.concurrency.singleflight import SingleFlight
+from src.infrastructure.http.encoding import json_bytes
+from src.infrastructure.http.pagination import InvalidCursorError, paginate
+from src.infrastructure.metrics.middleware import REQUEST_SECONDS, MetricsMiddleware
+from src.infrastructure.metrics.profiling import current_profile, end_profile, stage, start_profile
+from src.infrastructure.metrics.registry import REGISTRY
 
 
 class EventStub:
@@ -15,6 +39,7 @@ class EventStub:
         departure_time: str,
         arrival_time: str,
     ):
+        self.event_id = f"{flight_number}-{departure_time[:10]}"
         self.flight_number = flight_number
         self.from_city = from_city
         self.to_city = to_city
@@ -27,10 +52,17 @@ class StubFlightEventService:
 
     def __init__(self, events: List[EventStub]):
         self._events = events
+        self._store = FlightEventStore(events)
 
     def list_all(self) -> List[EventStub]:
         return self._events
 
+    def snapshot(self) -> FlightEventStore:
+        return self._store
+
+    def published(self) -> Tuple[FlightEventStore, str]:
+        return self._store, f"v{self._store.version}"
+
 
 def build_default_events() -> List[EventStub]:
     """Dataset con todos los escenarios que queremos testear."""
@@ -222,3 +254,659 @@ def test_no_results_when_no_route():
     journeys = service.search(date(2025, 2, 1), "FRA", "MIA")
 
     assert journeys == []
+
+
+def test_connection_window_boundaries():
+    """Se acepta una espera de exactamente 4hs; no se acepta salir a la misma hora que se llega."""
+    events = [
+        EventStub("A1", "AAA", "HUB", "2025-06-01T08:00:00",
+                  "2025-06-01T10:00:00"),
+        # sale justo cuando llega A1: inválido
+        EventStub("B0", "HUB", "CCC", "2025-06-01T10:00:00",
+                  "2025-06-01T11:00:00"),
+        EventStub("B1", "HUB", "CCC", "2025-06-01T10:30:00",
+                  "2025-06-01T11:30:00"),
+        # otro destino dentro de la ventana
+        EventStub("B2", "HUB", "DDD", "2025-06-01T11:00:00",
+                  "2025-06-01T12:00:00"),
+        # espera de exactamente 4hs: válido
+        EventStub("B3", "HUB", "CCC", "2025-06-01T14:00:00",
+                  "2025-06-01T15:00:00"),
+        # espera de 4hs y 1 minuto: inválido
+        EventStub("B4", "HUB", "CCC", "2025-06-01T14:01:00",
+                  "2025-06-01T15:00:00"),
+    ]
+    service = JourneySearchService(StubFlightEventService(events))
+
+    journeys = service.search(date(2025, 6, 1), "AAA", "CCC")
+
+    routes = [[seg.flight_number for seg in j.path] for j in journeys]
+    assert routes == [["A1", "B1"], ["A1", "B3"]]
+
+
+def test_multi_leg_journeys_respect_max_connections():
+    """Con max_connections=3 aparecen journeys de 3 tramos; por defecto se mantiene el máximo de 2."""
+    events = [
+        EventStub("X1", "AAA", "BBB", "2025-07-01T06:00:00",
+                  "2025-07-01T08:00:00"),
+        EventStub("X2", "BBB", "CCC", "2025-07-01T09:00:00",
+                  "2025-07-01T11:00:00"),
+        EventStub("X3", "CCC", "DDD", "2025-07-01T13:00:00",
+                  "2025-07-01T15:00:00"),
+        # volver al origen no forma un journey válido
+        EventStub("X4", "BBB", "AAA", "2025-07-01T09:30:00",
+                  "2025-07-01T10:00:00"),
+        # 4 tramos que superan las 24hs de viaje
+        EventStub("Y1", "CCC", "EEE", "2025-07-01T12:00:00",
+                  "2025-07-01T20:00:00"),
+        EventStub("Y2", "EEE", "DDD", "2025-07-01T23:00:00",
+                  "2025-07-02T07:00:00"),
+    ]
+    service = JourneySearchService(StubFlightEventService(events))
+
+    assert service.search(date(2025, 7, 1), "AAA", "DDD") == []
+
+    journeys = service.search(date(2025, 7, 1), "AAA", "DDD", max_connections=4)
+
+    routes = [[seg.flight_number for seg in j.path] for j in journeys]
+    assert routes == [["X1", "X2", "X3"]]
+    assert journeys[0].connections == 3
+
+
+def test_connection_after_midnight():
+    """Un segundo tramo que sale después de medianoche, dentro de las 4hs de espera, es válido."""
+    events = [
+        EventStub("N1", "AAA", "BBB", "2025-08-01T19:00:00",
+                  "2025-08-01T22:30:00"),
+        EventStub("N2", "BBB", "CCC", "2025-08-02T01:00:00",
+                  "2025-08-02T06:00:00"),
+        # espera > 4hs
+        EventStub("N3", "BBB", "CCC", "2025-08-02T03:00:00",
+                  "2025-08-02T08:00:00"),
+    ]
+    service = JourneySearchService(StubFlightEventService(events))
+
+    journeys = service.search(date(2025, 8, 1), "AAA", "CCC")
+
+    routes = [[seg.flight_number for seg in j.path] for j in journeys]
+    assert routes == [["N1", "N2"]]
+    # el primer tramo siempre sale el día buscado
+    assert service.search(date(2025, 8, 2), "BBB", "CCC")[0].path[0].flight_number == "N2"
+
+
+def test_cache_hits_and_invalidates_only_changed_dates(tmp_path):
+    """El cache responde búsquedas repetidas y una recarga solo descarta las fechas afectadas."""
+    def event(flight_number, from_city, to_city, departure_time, arrival_time):
+        return {
+            "event_id": f"{flight_number}-{departure_time[:10]}",
+            "flight_number": flight_number,
+            "from": from_city,
+            "to": to_city,
+            "departure_time": departure_time,
+            "arrival_time": arrival_time,
+        }
+
+    events = [
+        event("AR1000", "EZE", "MIA", "2025-02-01T08:00:00", "2025-02-01T16:00:00"),
+        event("HK100", "HKG", "NRT", "2025-03-05T07:30:00", "2025-03-05T12:30:00"),
+    ]
+    data_path = tmp_path / "flight_events.json"
+    data_path.write_text(json.dumps(events))
+
+    flight_event_service = FlightEventService(data_path=str(data_path))
+    cache = JourneySearchCache(flight_event_service, max_size=16, ttl=60)
+    service = JourneySearchService(flight_event_service, cache=cache)
+
+    service.search(date(2025, 2, 1), "EZE", "MIA")
+    service.search(date(2025, 2, 1), "EZE", "MIA")
+    service.search(date(2025, 3, 5), "HKG", "NRT")
+    assert (cache.hits, cache.misses, len(cache)) == (1, 2, 2)
+
+    # nuevo vuelo directo el 02-01: solo se invalida esa fecha
+    events.append(event("AR1002", "EZE", "MIA",
+                  "2025-02-01T20:00:00", "2025-02-02T04:00:00"))
+    data_path.write_text(json.dumps(events))
+    flight_event_service.reload()
+
+    assert len(cache) == 1
+    assert len(service.search(date(2025, 3, 5), "HKG", "NRT")) == 1
+    assert cache.hits == 2
+    assert len(service.search(date(2025, 2, 1), "EZE", "MIA")) == 2
+    assert cache.misses == 3
+
+
+def test_route_table_serves_precomputed_pairs():
+    """Los pares configurados se responden desde la tabla precalculada; el resto va a la búsqueda en vivo."""
+    data_path = Path(__file__).parents[1] / "flight_events" / "flight_events.json"
+    flight_event_service = FlightEventService(data_path=str(data_path))
+    route_table = RouteTable(
+        flight_event_service,
+        searcher=JourneySearchService(flight_event_service),
+        pairs=[("EZE", "MIA")],
+        horizon_days=2,
+        refresh_interval=60,
+        max_connections=2,
+    )
+    cache = JourneySearchCache(flight_event_service, max_size=16, ttl=60)
+    service = JourneySearchService(
+        flight_event_service, cache=cache, route_table=route_table)
+
+    route_table.refresh(today=date(2025, 2, 1))
+    assert len(route_table) == 2
+
+    journeys = service.search(date(2025, 2, 1), "EZE", "MIA")
+    assert [[seg.flight_number for seg in j.path] for j in journeys] == [
+        ["AR1000"], ["LA3000", "AA3001"], ["AR2000", "IB2001"]]
+    # no pasó por el cache
+    assert cache.misses == 0
+
+    service.search(date(2025, 3, 5), "HKG", "NRT")
+    assert cache.misses == 1
+
+
+def test_search_async_runs_in_pool_with_back_pressure():
+    """La búsqueda async corre en el pool y, con la cola llena, falla enseguida con ExecutorOverloadedError."""
+    service = JourneySearchService(
+        StubFlightEventService(build_default_events()),
+        executor=BoundedExecutor(kind="thread", max_workers=1, max_pending=0),
+    )
+
+    async def scenario():
+        journeys = await service.search_async(date(2025, 3, 5), "HKG", "NRT")
+        assert [[seg.flight_number for seg in j.path] for j in journeys] == [
+            ["HK100"], ["HK200", "PR201"]]
+
+        # ocupamos el único worker: la siguiente búsqueda se rechaza
+        release = threading.Event()
+        busy = asyncio.ensure_future(service._executor.run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorOverloadedError):
+            await service.search_async(date(2025, 3, 5), "HKG", "NRT")
+        release.set()
+        await busy
+
+    asyncio.run(scenario())
+
+
+def test_batch_search_matches_individual_searches():
+    """El batch agrupa por fecha y origen pero devuelve, en orden, lo mismo que cada búsqueda individual."""
+    service = JourneySearchService(StubFlightEventService(build_default_events()))
+    queries = [
+        (date(2025, 2, 1), "EZE", "MIA"),
+        (date(2025, 3, 5), "HKG", "NRT"),
+        (date(2025, 2, 1), "EZE", "GRU"),
+        (date(2025, 2, 1), "EZE", "MIA"),
+        (date(2025, 2, 1), "FRA", "MIA"),
+    ]
+
+    results = service.search_batch(queries)
+
+    assert len(results) == len(queries)
+    for query, journeys in zip(queries, results):
+        expected = service.search(*query)
+        assert [[seg.flight_number for seg in j.path] for j in journeys] == [
+            [seg.flight_number for seg in j.path] for j in expected]
+    assert [len(r) for r in results] == [3, 2, 1, 3, 0]
+
+
+def test_range_search_groups_by_day():
+    """La búsqueda por rango devuelve un grupo por día, con el journey más corto y el de menos conexiones."""
+    service = JourneySearchService(StubFlightEventService(build_default_events()))
+
+    days = service.search_range(date(2025, 1, 31), date(2025, 2, 2), "EZE", "MIA")
+
+    assert [d.date for d in days] == [
+        date(2025, 1, 31), date(2025, 2, 1), date(2025, 2, 2)]
+    assert days[0].journeys == [] and days[0].shortest is None
+
+    feb_1 = days[1]
+    assert len(feb_1.journeys) == 3
+    assert feb_1.fewest_connections.path[0].flight_number == "AR1000"
+    # directo de 8hs vs LA3000 + AA3001 de 11:30hs
+    assert feb_1.shortest.path[0].flight_number == "AR1000"
+
+    assert [[seg.flight_number for seg in j.path] for j in days[2].journeys] == [["AR1001"]]
+
+
+def test_journeys_serialize_straight_to_json():
+    """La respuesta se arma desde los DTOs con el mismo schema que los modelos del controller."""
+    service = JourneySearchService(StubFlightEventService(build_default_events()))
+
+    journeys = service.search(date(2025, 3, 5), "HKG", "NRT")
+    body = json.loads(json_bytes([journey_to_dict(j) for j in journeys]))
+
+    assert body == [
+        {"connections": 1, "path": [
+            {"flight_number": "HK100", "from_city": "HKG", "to_city": "NRT",
+             "departure_time": "2025-03-05T07:30:00", "arrival_time": "2025-03-05T12:30:00"},
+        ]},
+        {"connections": 2, "path": [
+            {"flight_number": "HK200", "from_city": "HKG", "to_city": "MNL",
+             "departure_time": "2025-03-05T08:00:00", "arrival_time": "2025-03-05T10:00:00"},
+            {"flight_number": "PR201", "from_city": "MNL", "to_city": "NRT",
+             "departure_time": "2025-03-05T12:00:00", "arrival_time": "2025-03-05T17:00:00"},
+        ]},
+    ]
+
+    days = service.search_range(date(2025, 3, 5), date(2025, 3, 5), "HKG", "NRT")
+    day = json.loads(json_bytes(journey_day_to_dict(days[0])))
+    assert day["date"] == "2025-03-05"
+    assert day["shortest"] == day["fewest_connections"] == body[0]
+
+
+def test_filtered_top_k_search_matches_filtering_full_result():
+    """Los filtros y el limit dentro de la búsqueda devuelven lo mismo que filtrar el resultado completo."""
+    service = JourneySearchService(StubFlightEventService(build_default_events()))
+    full = service.search(date(2025, 2, 1), "EZE", "MIA")
+
+    def routes(journeys):
+        return [[seg.flight_number for seg in j.path] for j in journeys]
+
+    # solo los 2 mejores: el directo y la conexión más corta (vía GRU)
+    top = service.search(date(2025, 2, 1), "EZE", "MIA", filters=SearchFilters(limit=2))
+    assert routes(top) == routes(full[:2]) == [["AR1000"], ["LA3000", "AA3001"]]
+
+    filters = [
+        SearchFilters(max_duration=12 * 60),
+        SearchFilters(depart_after=datetime(2025, 2, 1, 7, 30)),
+        SearchFilters(arrive_before=datetime(2025, 2, 1, 18, 0)),
+        SearchFilters(limit=1, depart_after=datetime(2025, 2, 1, 8, 30)),
+    ]
+    for f in filters:
+        filtered = service.search(date(2025, 2, 1), "EZE", "MIA", filters=f)
+        assert routes(filtered) == routes(f.apply(full))
+
+    assert routes(service.search(
+        date(2025, 2, 1), "EZE", "MIA", filters=filters[0])) == [["AR1000"], ["LA3000", "AA3001"]]
+    assert routes(service.search(
+        date(2025, 2, 1), "EZE", "MIA", filters=filters[3])) == [["AR2000", "IB2001"]]
+
+
+def test_city_group_search_matches_pairwise_searches():
+    """Buscar entre grupos de aeropuertos devuelve lo mismo que buscar cada par por separado."""
+    events = [
+        EventStub("BA1", "LHR", "JFK", "2025-05-01T09:00:00",
+                  "2025-05-01T17:00:00"),
+        EventStub("VS2", "LGW", "EWR", "2025-05-01T10:00:00",
+                  "2025-05-01T17:30:00"),
+        EventStub("FR3", "STN", "DUB", "2025-05-01T06:00:00",
+                  "2025-05-01T07:00:00"),
+        EventStub("EI4", "DUB", "JFK", "2025-05-01T09:00:00",
+                  "2025-05-01T16:00:00"),
+        # LHR -> LGW -> EWR: pasa por otro aeropuerto del grupo de origen
+        EventStub("BA5", "LHR", "LGW", "2025-05-01T07:00:00",
+                  "2025-05-01T08:00:00"),
+        EventStub("AA6", "LHR", "MIA", "2025-05-01T08:00:00",
+                  "2025-05-01T18:00:00"),
+    ]
+    groups = {"LON": ["LHR", "LGW", "STN"], "NYC": ["JFK", "EWR", "LGA"]}
+    service = JourneySearchService(StubFlightEventService(events), city_groups=groups)
+
+    journeys = service.search(date(2025, 5, 1), "LON", "NYC")
+
+    pairwise = [
+        j for from_city in groups["LON"] for to_city in groups["NYC"]
+        for j in service.search(date(2025, 5, 1), from_city, to_city)
+    ]
+    routes = [[seg.flight_number for seg in j.path] for j in journeys]
+    assert sorted(routes) == sorted([seg.flight_number for seg in j.path] for j in pairwise)
+    assert routes == [["VS2"], ["BA1"], ["FR3", "EI4"], ["BA5", "VS2"]]
+
+    # los grupos también se pueden combinar con un aeropuerto puntual
+    assert [[seg.flight_number for seg in j.path]
+            for j in service.search(date(2025, 5, 1), "LON", "JFK")] == [["BA1"], ["FR3", "EI4"]]
+
+    # la búsqueda inversa entre grupos también coincide con la de cada par
+    arrive_by = datetime(2025, 5, 1, 23, 0)
+    pairwise = [
+        j for from_city in groups["LON"] for to_city in groups["NYC"]
+        for j in service.search_arrive_by(arrive_by, from_city, to_city)
+    ]
+    assert sorted([seg.flight_number for seg in j.path]
+                  for j in service.search_arrive_by(arrive_by, "LON", "NYC")) == sorted(
+        [seg.flight_number for seg in j.path] for j in pairwise)
+
+
+def test_arrive_by_search_matches_forward_search():
+    """La búsqueda inversa devuelve los journeys que llegan antes del horario pedido, con las mismas reglas."""
+    service = JourneySearchService(StubFlightEventService(build_default_events()))
+
+    def routes(journeys):
+        return [[seg.flight_number for seg in j.path] for j in journeys]
+
+    # a MIA antes de las 18:00: el directo y la conexión vía GRU (llega 18:30) queda afuera
+    assert routes(service.search_arrive_by(datetime(2025, 2, 1, 18, 0), "EZE", "MIA")) == [
+        ["AR1000"]]
+    assert routes(service.search_arrive_by(datetime(2025, 2, 1, 18, 30), "EZE", "MIA")) == [
+        ["AR1000"], ["LA3000", "AA3001"]]
+
+    # se consideran los últimos tramos de las 24hs previas, aunque lleguen el día anterior
+    assert routes(service.search_arrive_by(datetime(2025, 2, 2, 0, 30), "EZE", "MIA")) == [
+        ["AR1000"], ["LA3000", "AA3001"]]
+    # la conexión vía MAD sale el día anterior a la llegada
+    assert routes(service.search_arrive_by(datetime(2025, 2, 2, 6, 0), "EZE", "MIA")) == [
+        ["AR1000"], ["LA3000", "AA3001"], ["AR2000", "IB2001"]]
+    # AR1000 llegó hace más de 24hs
+    assert routes(service.search_arrive_by(datetime(2025, 2, 2, 16, 30), "EZE", "MIA")) == [
+        ["LA3000", "AA3001"], ["AR2000", "IB2001"]]
+
+    # la espera de más de 4hs en SCL se descarta igual que en la búsqueda normal
+    assert service.search_arrive_by(datetime(2025, 1, 20, 23, 59), "EZE", "MIA") == []
+    assert routes(service.search_arrive_by(datetime(2025, 3, 5, 23, 0), "HKG", "NRT")) == routes(
+        service.search(date(2025, 3, 5), "HKG", "NRT"))
+
+
+def test_pareto_profile_returns_only_non_dominated_journeys():
+    """Con profile=pareto no se devuelven journeys que otro supera en salida, llegada y tramos."""
+    events = [
+        EventStub("D1", "AAA", "CCC", "2025-06-01T08:00:00",
+                  "2025-06-01T14:00:00"),
+        # sale antes y llega después que D1, con más tramos: dominado
+        EventStub("C1", "AAA", "BBB", "2025-06-01T07:00:00",
+                  "2025-06-01T09:00:00"),
+        EventStub("C2", "BBB", "CCC", "2025-06-01T10:00:00",
+                  "2025-06-01T15:00:00"),
+        # sale después que D1 pero con una escala llega antes: no dominado
+        EventStub("C3", "AAA", "DDD", "2025-06-01T09:00:00",
+                  "2025-06-01T10:00:00"),
+        EventStub("C4", "DDD", "CCC", "2025-06-01T11:00:00",
+                  "2025-06-01T13:00:00"),
+        # directo más tarde: no dominado (sale más tarde, aunque llega más tarde)
+        EventStub("D2", "AAA", "CCC", "2025-06-01T12:00:00",
+                  "2025-06-01T18:00:00"),
+    ]
+    service = JourneySearchService(StubFlightEventService(events))
+
+    full = service.search(date(2025, 6, 1), "AAA", "CCC")
+    pareto = service.search(date(2025, 6, 1), "AAA", "CCC", filters=SearchFilters(pareto=True))
+
+    def routes(journeys):
+        return [[seg.flight_number for seg in j.path] for j in journeys]
+
+    assert len(full) == 4
+    assert routes(pareto) == [["D1"], ["D2"], ["C3", "C4"]]
+    assert routes(SearchFilters(pareto=True).apply(full)) == routes(pareto)
+
+
+def test_search_on_sqlite_backend_matches_in_memory_store(tmp_path):
+    """Las búsquedas sobre el backend SQLite devuelven los mismos journeys que sobre el store en memoria."""
+    events = build_default_events()
+    db_path = str(tmp_path / "flight_events.db")
+    write_sqlite(FlightEventStore(events), db_path)
+
+    in_memory = JourneySearchService(StubFlightEventService(events))
+    on_sqlite = JourneySearchService(FlightEventService(db_path, backend="sqlite"))
+
+    queries = [
+        (date(2025, 2, 1), "EZE", "MIA"),
+        (date(2025, 3, 5), "HKG", "NRT"),
+        (date(2025, 1, 20), "EZE", "MIA"),
+        (date(2025, 2, 10), "LHR", "LHR"),
+        (date(2025, 2, 1), "EZE", "XXX"),
+    ]
+
+    def routes(journeys):
+        return [journey_to_dict(j) for j in journeys]
+
+    for flight_date, from_city, to_city in queries:
+        for max_connections in (2, 3):
+            assert routes(on_sqlite.search(
+                flight_date, from_city, to_city, max_connections=max_connections)) == routes(
+                in_memory.search(flight_date, from_city, to_city, max_connections=max_connections))
+
+    arrive_by = datetime(2025, 2, 2, 8, 0)
+    assert routes(on_sqlite.search_arrive_by(arrive_by, "EZE", "MIA")) == routes(
+        in_memory.search_arrive_by(arrive_by, "EZE", "MIA"))
+
+
+def test_search_profile_records_stages_and_counters():
+    """Con un perfil activo la búsqueda registra el tiempo de cada etapa y los contadores."""
+    service = JourneySearchService(StubFlightEventService(build_default_events()))
+    before = JOURNEYS_EMITTED.value()
+
+    # Sin perfil solo se actualizan las métricas agregadas
+    assert current_profile() is None
+    service.search(date(2025, 2, 1), "EZE", "MIA")
+    assert JOURNEYS_EMITTED.value() == before + 3
+
+    token = start_profile()
+    try:
+        service.search(date(2025, 2, 1), "EZE", "MIA")
+        profile = current_profile()
+    finally:
+        end_profile(token)
+
+    assert list(profile.stages) == ["lookup", "scan", "bounds", "enumerate", "build"]
+    assert profile.counts["journey_search_journeys_emitted_total"] == 3
+    assert profile.counts["journey_search_events_scanned_total"] > 0
+    assert "build=" in profile.header()
+
+    text = REGISTRY.render()
+    assert "# TYPE search_stage_duration_seconds histogram" in text
+    assert 'search_stage_duration_seconds_bucket{stage="scan",le="+Inf"}' in text
+    assert 'journey_search_lookups_total{result="miss"}' in text
+
+
+def test_metrics_middleware_adds_profile_header_on_request():
+    """El header X-Search-Profile solo se devuelve si el request lo pide."""
+    async def app(scope, receive, send):
+        with stage("scan"):
+            pass
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"[]"})
+
+    async def call(headers):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": "/journeys/search", "headers": headers}
+        await MetricsMiddleware(app)(scope, None, send)
+        return dict(messages[0]["headers"])
+
+    assert b"x-search-profile" not in asyncio.run(call([]))
+    profile = asyncio.run(call([(b"x-search-profile", b"1")]))[b"x-search-profile"]
+    assert profile.startswith(b"scan=")
+    assert REQUEST_SECONDS.count(("GET", "unmatched", "200")) >= 2
+
+
+def test_concurrent_identical_searches_are_coalesced():
+    """Búsquedas idénticas en paralelo se calculan una sola vez; un error llega a todas y una cancelación no corta el cálculo."""
+    service = JourneySearchService(
+        StubFlightEventService(build_default_events()),
+        executor=BoundedExecutor(kind="thread", max_workers=2, max_pending=16),
+        single_flight=SingleFlight(),
+    )
+    search_snapshot_many = service.search_snapshot_many
+    calls, release, fail = [], threading.Event(), []
+
+    def counting(store, keys):
+        calls.append(keys)
+        release.wait()
+        if fail:
+            raise RuntimeError("boom")
+        return search_snapshot_many(store, keys)
+
+    service.search_snapshot_many = counting
+
+    def search(to_city="MIA"):
+        return asyncio.ensure_future(service.search_async(date(2025, 2, 1), "EZE", to_city))
+
+    async def scenario():
+        # 10 requests idénticos + uno distinto: dos cálculos
+        searches = [search() for _ in range(10)] + [search("MAD")]
+        await asyncio.sleep(0.05)
+        release.set()
+        results = await asyncio.gather(*searches)
+        assert len(calls) == 2
+        # Mismo resultado para todos, pero cada uno con su propia lista
+        first_legs = [[j.path[0].flight_number for j in r] for r in results[:10]]
+        assert first_legs == [["AR1000", "LA3000", "AR2000"]] * 10
+        assert all(r is not results[0] for r in results[1:10])
+
+        # Cancelar al que lanzó el cálculo no lo corta para los demás
+        release.clear()
+        calls.clear()
+        first, second = search("GRU"), search("GRU")
+        await asyncio.sleep(0.05)
+        first.cancel()
+        release.set()
+        assert [j.path[0].flight_number for j in await second] == ["LA3000"]
+        assert first.cancelled() and len(calls) == 1
+
+        # Un error se propaga a todos los que esperaban y la clave queda libre
+        fail.append(True)
+        release.clear()
+        failing = [search("SCL") for _ in range(3)]
+        await asyncio.sleep(0.05)
+        release.set()
+        for result in await asyncio.gather(*failing, return_exceptions=True):
+            assert isinstance(result, RuntimeError)
+        assert len(service._single_flight) == 0
+
+    asyncio.run(scenario())
+
+
+def test_process_pool_workers_follow_reloads(tmp_path):
+    """En modo "process" todos los workers buscan sobre la revision recargada, incluso los que reciben su primera tarea despues de la recarga."""
+    events = [
+        {"event_id": "AR1000-2025-02-01", "flight_number": "AR1000", "from": "EZE", "to": "MIA",
+         "departure_time": "2025-02-01T08:00:00", "arrival_time": "2025-02-01T16:00:00"},
+        {"event_id": "AR1001-2025-02-01", "flight_number": "AR1001", "from": "EZE", "to": "MIA",
+         "departure_time": "2025-02-01T12:00:00", "arrival_time": "2025-02-01T20:00:00"},
+    ]
+    data_path = tmp_path / "flight_events.json"
+    data_path.write_text(json.dumps(events))
+
+    flight_event_service = FlightEventService(data_path=str(data_path))
+    flight_event_service.load()
+    executor = BoundedExecutor(
+        kind="process", max_workers=4, max_pending=64,
+        initializer=init_search_worker, initargs=(str(data_path),))
+    service = JourneySearchService(flight_event_service, executor=executor)
+
+    async def flight_numbers(searches):
+        results = await asyncio.gather(*(
+            service.search_async(date(2025, 2, 1), "EZE", "MIA", max_connections=1)
+            for _ in range(searches)))
+        return {tuple(j.path[0].flight_number for j in journeys) for journeys in results}
+
+    try:
+        # una sola busqueda levanta el pool: todos los workers cargan la version
+        # inicial, pero solo uno recibe una tarea
+        assert asyncio.run(flight_numbers(1)) == {("AR1000", "AR1001")}
+
+        data_path.write_text(json.dumps(events[1:]))
+        flight_event_service.reload()
+
+        assert asyncio.run(flight_numbers(16)) == {("AR1001",)}
+    finally:
+        executor.shutdown()
+
+
+def test_search_endpoint_accepts_timezone_aware_datetimes():
+    """Los horarios con zona ("Z", "-03:00") se pasan a UTC en vez de fallar contra el schedule naive."""
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+
+    from src.application.app import create_app
+
+    def flight_numbers(response):
+        assert response.status_code == 200
+        return [[seg["flight_number"] for seg in j["path"]] for j in response.json()]
+
+    with TestClient(create_app()) as client:
+        utc = client.get("/journeys/search", params={
+            "date": "2025-02-01T05:00:00Z",
+            "from_city": "EZE",
+            "to_city": "MIA",
+            "depart_after": "2025-02-01T07:30:00Z",
+            "arrive_before": "2025-02-01T16:00:00Z",
+        })
+        offset = client.get("/journeys/search", params={
+            "date": "2025-02-01T05:00:00-03:00",
+            "from_city": "EZE",
+            "to_city": "MIA",
+            "depart_after": "2025-02-01T04:30:00-03:00",
+            "arrive_before": "2025-02-01T13:00:00-03:00",
+        })
+        arrive_by = client.get("/journeys/search/arrive-by", params={
+            "arrive_by": "2025-02-01T18:00:00Z",
+            "from_city": "EZE",
+            "to_city": "MIA",
+        })
+
+    assert flight_numbers(utc) == flight_numbers(offset) == [["AR1000"]]
+    assert flight_numbers(arrive_by) == [["AR1000"]]
+
+
+def test_search_day_is_the_calendar_date_sent_by_the_client():
+    """La fecha de busqueda no se pasa a UTC: con un offset cerca de medianoche se busca el dia enviado."""
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+
+    from src.application.app import create_app
+
+    def flight_numbers(journeys):
+        return [[seg["flight_number"] for seg in j["path"]] for j in journeys]
+
+    def search(date):
+        response = client.get("/journeys/search", params={"date": date, "from_city": "EZE", "to_city": "MIA"})
+        assert response.status_code == 200
+        return flight_numbers(response.json())
+
+    with TestClient(create_app()) as client:
+        expected = search("2025-02-01T00:00:00")
+        assert ["AR1000"] in expected
+        # en UTC serian el 31/01 y el 02/02
+        assert search("2025-02-01T00:00:00+05:00") == expected
+        assert search("2025-02-01T22:00:00-03:00") == expected
+
+        batch = client.post("/journeys/search/batch", json={"queries": [
+            {"date": "2025-02-01T00:00:00+05:00", "from_city": "EZE", "to_city": "MIA"},
+            {"date": "2025-02-01T22:00:00-03:00", "from_city": "EZE", "to_city": "MIA"},
+        ]})
+        assert [flight_numbers(journeys) for journeys in batch.json()] == [expected, expected]
+
+        days = client.get("/journeys/search/range", params={
+            "date_from": "2025-02-01T00:00:00+05:00",
+            "date_to": "2025-02-01T22:00:00-03:00",
+            "from_city": "EZE",
+            "to_city": "MIA",
+        }).json()
+        assert [(day["date"], flight_numbers(day["journeys"])) for day in days] == [("2025-02-01", expected)]
+
+
+def test_search_cursor_is_valid_on_every_worker_with_the_same_data(tmp_path):
+    """El cursor de la busqueda lleva la revision de los datos: otro worker con el mismo archivo lo acepta."""
+    source = Path(__file__).parents[1] / "flight_events" / "flight_events.json"
+    events = json.loads(source.read_text())
+    data_path = tmp_path / "flight_events.json"
+    data_path.write_text(json.dumps(events[1:]))
+
+    # un worker que ya recargo una vez y otro que arranco con el archivo actual
+    reloaded = FlightEventService(data_path=str(data_path))
+    reloaded.load()
+    data_path.write_text(json.dumps(events))
+    reloaded.reload()
+    fresh = FlightEventService(data_path=str(data_path))
+    assert reloaded.snapshot().version != fresh.snapshot().version
+
+    async def page(flight_event_service, cursor):
+        service = JourneySearchService(flight_event_service)
+        journeys, revision = await service.search_with_revision_async(date(2025, 2, 1), "EZE", "MIA")
+        assert revision == flight_event_service.revision()
+        return journeys, paginate(len(journeys), revision, cursor, limit=1)
+
+    journeys, first = asyncio.run(page(reloaded, None))
+    assert first.next_cursor is not None
+    others, second = asyncio.run(page(fresh, first.next_cursor))
+    assert second.start == 1
+    assert [journey_to_dict(j) for j in others] == [journey_to_dict(j) for j in journeys]
+
+    # con otros datos el cursor vence
+    data_path.write_text(json.dumps(events[2:]))
+    fresh.reload()
+    with pytest.raises(InvalidCursorError):
+        asyncio.run(page(fresh, first.next_cursor))
@@ -0,0 +1,68 @@
+import asyncio
+import contextvars
+import functools
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Literal, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+ExecutorKind = Literal["thread", "process"]
+
+
+class ExecutorOverloadedError(Exception):
+    """No hay lugar en la cola del pool: el request debe rechazarse (503)."""
+
+
+class BoundedExecutor:
+    """Pool de threads o procesos para trabajo CPU-bound, con cola acotada.
+
+    A lo sumo `max_workers` tareas corren en paralelo y `max_pending` esperan turno;
+    pasado ese limite `run` falla enseguida con ExecutorOverloadedError en lugar de
+    encolar sin limite (back-pressure).
+    """
+
+    def __init__(
+        self,
+        kind: ExecutorKind,
+        max_workers: int,
+        max_pending: int,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Sequence[Any] = (),
+    ):
+        self.kind = kind
+        self.max_workers = max_workers
+        self.capacity = max_workers + max_pending
+        # Solo se modifica desde el event loop, no necesita lock
+        self.in_flight = 0
+
+        self._pool: Executor
+        if kind == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=max_workers, initializer=initializer, initargs=tuple(initargs))
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="search",
+                initializer=initializer, initargs=tuple(initargs))
+
+        logger.info(
+            f"Started {kind} pool with {max_workers} workers and {max_pending} pending slots")
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if self.in_flight >= self.capacity:
+            raise ExecutorOverloadedError(
+                f"Executor queue is full ({self.in_flight}/{self.capacity})")
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(fn, *args, **kwargs)
+            if self.kind == "thread":
+                # El thread ve el contexto del request (por ejemplo su perfil de etapas)
+                call = functools.partial(contextvars.copy_context().run, call)
+            return await loop.run_in_executor(self._pool, call)
+        finally:
+            self.in_flight -= 1
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
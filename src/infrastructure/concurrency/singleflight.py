@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, TypeVar
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """Agrupa llamadas concurrentes con la misma clave en un solo calculo.
+
+    El primero que pide una clave lanza el calculo como task; los que llegan mientras
+    esta en curso esperan ese mismo task y reciben su resultado o su excepcion. El task
+    se espera con `shield`: si se cancela el request que lo lanzo (el cliente corto la
+    conexion) el calculo sigue para el resto. Al terminar, la clave se libera y la
+    proxima llamada calcula de nuevo (el cache, si hay, es responsabilidad de `compute`).
+
+    Solo se usa desde el event loop, no necesita lock.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[K, "asyncio.Task[Dict[K, V]]"] = {}
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._in_flight
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    async def run_many(
+        self, keys: List[K], compute: Callable[[List[K]], Awaitable[Dict[K, V]]]
+    ) -> Dict[K, V]:
+        """Resultado de cada clave; las que no estan en curso se calculan juntas con `compute`."""
+        keys = list(dict.fromkeys(keys))
+        new = [key for key in keys if key not in self._in_flight]
+        if new:
+            task = asyncio.ensure_future(compute(new))
+            for key in new:
+                self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._forget(new, t))
+
+        tasks = {key: self._in_flight[key] for key in keys}
+        # Si se cancela este request, gather cancela los shields y no los calculos
+        await asyncio.gather(*(asyncio.shield(t) for t in set(tasks.values())))
+        return {key: task.result()[key] for key, task in tasks.items()}
+
+    def _forget(self, keys: List[K], task: "asyncio.Task[Dict[K, V]]") -> None:
+        for key in keys:
+            if self._in_flight.get(key) is task:
+                del self._in_flight[key]
+        # Si todos los que esperaban se cancelaron nadie lee la excepcion: la logueamos
+        # aca para que no quede como "Task exception was never retrieved"
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Coalesced computation failed: {task.exception()!r}")
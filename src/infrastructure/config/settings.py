@@ -6,7 +6,7 @@ load_dotenv(dotenv_path=ENV_PATH)  # noqa: E402
 
 from pydantic_settings import BaseSettings
 from pydantic import Field, field_validator
-from typing import List, Literal
+from typing import Dict, List, Literal, Optional, Tuple
 from enum import Enum
 import logging
 
@@ -31,6 +31,15 @@ class Settings(BaseSettings):
     # ============= API =============
     api_prefix: str = Field(default="/api")
     api_v1_prefix: str = Field(default="/api/v1")
+    # max-age (segundos) de las respuestas GET con ETag; 0 = el CDN revalida siempre
+    http_cache_max_age: int = Field(default=0)
+
+    # ============= SERVER =============
+    # Con mas de un worker (fuera de development) el schedule se carga una vez en el
+    # proceso padre y los workers lo heredan por fork
+    server_host: str = Field(default="0.0.0.0")
+    server_port: int = Field(default=8000)
+    server_workers: int = Field(default=1)
 
     # ============= LOGGING =============
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = Field(
@@ -48,6 +57,41 @@ class Settings(BaseSettings):
     cors_allow_methods: List[str] = Field(default=["*"])
     cors_allow_headers: List[str] = Field(default=["*"])
 
+    # ============= FLIGHT EVENTS =============
+    # JSON, JSON Lines o snapshot binario; por defecto el JSON incluido en el repo
+    flight_events_path: Optional[str] = Field(default=None)
+    # "file" carga el schedule completo en memoria; "sqlite" lee de la base solo los buckets que busca
+    flight_events_backend: Literal["file", "sqlite"] = Field(default="file")
+    # Cada cuantos segundos se revisa si cambio el archivo de eventos (0 = deshabilitado)
+    flight_events_reload_interval: float = Field(default=5.0)
+
+    # ============= JOURNEYS =============
+    # Cantidad maxima de busquedas cacheadas (0 = sin cache) y su TTL en segundos
+    journey_cache_size: int = Field(default=1024)
+    journey_cache_ttl: float = Field(default=300.0)
+
+    # Rutas precalculadas en background: pares "EZE:MIA,HKG:NRT" (vacio = deshabilitado),
+    # cantidad de dias desde hoy y cada cuantos segundos se recalculan
+    route_table_pairs: str = Field(default="")
+    route_table_horizon_days: int = Field(default=7)
+    route_table_refresh_interval: float = Field(default=3600.0)
+
+    # Grupos de aeropuertos que se pueden usar como origen o destino de una busqueda:
+    # "LON:LHR|LGW|STN,NYC:JFK|EWR|LGA" (vacio = sin grupos)
+    city_groups: str = Field(default="")
+
+    # Pool para las busquedas en vivo: "thread" o "process" (cada proceso carga su
+    # propio store; conviene combinarlo con el snapshot binario), cantidad de workers
+    # y busquedas en espera antes de responder 503
+    search_executor: Literal["thread", "process"] = Field(default="thread")
+    search_executor_workers: int = Field(default=4)
+    search_executor_max_pending: int = Field(default=64)
+
+    # ============= METRICS =============
+    # Permite pedir el desglose por etapa con el header X-Search-Profile (las metricas
+    # agregadas en /metrics se registran siempre)
+    search_profile_header: bool = Field(default=True)
+
     # ============= COMPUTED PROPERTIES =============
     @property
     def is_production(self) -> bool:
@@ -61,6 +105,24 @@ class Settings(BaseSettings):
     def is_testing(self) -> bool:
         return self.environment == Environment.TESTING
 
+    @property
+    def route_table_pair_list(self) -> List[Tuple[str, str]]:
+        pairs = []
+        for pair in self.route_table_pairs.split(","):
+            if pair.strip():
+                from_city, to_city = pair.strip().split(":")
+                pairs.append((from_city.strip(), to_city.strip()))
+        return pairs
+
+    @property
+    def city_group_map(self) -> Dict[str, List[str]]:
+        groups = {}
+        for group in self.city_groups.split(","):
+            if group.strip():
+                code, cities = group.strip().split(":")
+                groups[code.strip()] = [c.strip() for c in cities.split("|") if c.strip()]
+        return groups
+
     # ============= VALIDATORS =============
     def get_logging_config(self) -> dict:
         return {
@@ -0,0 +1,31 @@
+import hashlib
+from typing import Dict, Iterable, Optional, Tuple
+
+ETAG_HEADER = "ETag"
+IF_NONE_MATCH_HEADER = "If-None-Match"
+
+
+def entity_tag(revision: str, path: str, params: Iterable[Tuple[str, str]]) -> str:
+    """ETag de una respuesta GET: revision de los datos + ruta + query (sin importar el orden)."""
+    query = "&".join(f"{key}={value}" for key, value in sorted(params))
+    digest = hashlib.blake2b(f"{path}?{query}".encode(), digest_size=8).hexdigest()
+    return f'"{revision}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparacion debil de If-None-Match (RFC 9110): ignora el prefijo W/ y acepta "*"."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in (tag.removeprefix("W/") for tag in candidates)
+
+
+def cache_headers(etag: str, max_age: int) -> Dict[str, str]:
+    # Con max-age=0 el CDN guarda la respuesta pero revalida en cada request: si el
+    # schedule no cambio recibe un 304 sin cuerpo
+    return {
+        ETAG_HEADER: etag,
+        "Cache-Control": f"public, max-age={max_age}, must-revalidate",
+    }
@@ -0,0 +1,42 @@
+import json
+from datetime import date
+from typing import Any, Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _default(value: Any) -> Any:
+    # Mismo formato que usa pydantic para fechas naive: ISO 8601
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+_encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def json_bytes(content: Any) -> bytes:
+    """Serializa dicts/listas con fechas directo a bytes JSON, sin modelos intermedios."""
+    return _encoder.encode(content).encode("utf-8")
+
+
+def iter_ndjson(
+    items: Iterable[T], to_dict: Callable[[T], dict], batch_size: int = 256
+) -> Iterator[bytes]:
+    """Serializa `items` como NDJSON a medida que se consumen.
+
+    Se emite un chunk cada `batch_size` lineas: la memoria queda acotada al chunk en
+    curso y el primer byte sale sin esperar al resto del resultado.
+    """
+    lines = []
+    for item in items:
+        lines.append(_encoder.encode(to_dict(item)))
+        if len(lines) >= batch_size:
+            lines.append("")
+            yield "\n".join(lines).encode("utf-8")
+            lines = []
+    if lines:
+        lines.append("")
+        yield "\n".join(lines).encode("utf-8")
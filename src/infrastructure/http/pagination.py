@@ -0,0 +1,136 @@
+import base64
+import binascii
+from typing import Callable, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Tamaño maximo de pagina aceptado en los endpoints paginados
+PAGE_SIZE_LIMIT = 10_000
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ValueError):
+    """Cursor mal formado o emitido para otra revision de los datos (400)."""
+
+
+def _cursor_headers(next_cursor: Optional[str]) -> dict:
+    return {} if next_cursor is None else {NEXT_CURSOR_HEADER: next_cursor}
+
+
+class Page:
+    """Rango `[start, stop)` de un resultado ordenado y el cursor de la pagina siguiente."""
+
+    __slots__ = ("start", "stop", "next_cursor")
+
+    def __init__(self, start: int, stop: int, next_cursor: Optional[str]):
+        self.start = start
+        self.stop = stop
+        self.next_cursor = next_cursor
+
+    @property
+    def headers(self) -> dict:
+        return _cursor_headers(self.next_cursor)
+
+
+def encode_cursor(revision: str, offset: int) -> str:
+    raw = f"{revision}:{offset}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        revision, offset = raw.decode("ascii").rsplit(":", 1)
+        offset = int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError("Malformed cursor")
+    if offset < 0:
+        raise InvalidCursorError("Malformed cursor")
+    return revision, offset
+
+
+def cursor_offset(cursor: Optional[str], revision: Optional[str] = None) -> int:
+    """Posicion donde empieza la pagina pedida (0 sin cursor).
+
+    Con `revision` ademas valida que el cursor se haya emitido para esos datos.
+    """
+    if cursor is None:
+        return 0
+    cursor_revision, offset = decode_cursor(cursor)
+    if revision is not None and cursor_revision != revision:
+        raise InvalidCursorError("Cursor expired: data was reloaded, restart from the first page")
+    return offset
+
+
+def paginate(total: int, revision: str, cursor: Optional[str], limit: Optional[int]) -> Page:
+    """Resuelve la pagina pedida sobre un resultado de `total` elementos.
+
+    El cursor es opaco para el cliente: codifica la revision de los datos (la misma en
+    todos los workers) y la posicion donde sigue la pagina. Si los datos se recargaron
+    entre paginas el cursor deja de ser valido, porque las posiciones ya no corresponden
+    a los mismos elementos. Sin `limit` se devuelve todo lo que queda desde el cursor.
+    """
+    start = min(cursor_offset(cursor, revision), total)
+    stop = total if limit is None else min(total, start + limit)
+    next_cursor = encode_cursor(revision, stop) if stop < total else None
+    return Page(start, stop, next_cursor)
+
+
+# ---------------------------------------------------------------------------
+# Paginacion por clave (keyset): el cursor es la ultima clave de la pagina
+# ---------------------------------------------------------------------------
+
+_KEY_CURSOR_PREFIX = "k:"
+
+
+class KeysetPage:
+    """Filas de una pagina pedida por clave y el cursor de la pagina siguiente."""
+
+    __slots__ = ("rows", "next_cursor")
+
+    def __init__(self, rows: Iterable, next_cursor: Optional[str]):
+        self.rows = rows
+        self.next_cursor = next_cursor
+
+    @property
+    def headers(self) -> dict:
+        return _cursor_headers(self.next_cursor)
+
+
+def encode_key_cursor(key: str) -> str:
+    raw = f"{_KEY_CURSOR_PREFIX}{key}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_key_cursor(cursor: str) -> str:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError("Malformed cursor")
+    if not raw.startswith(_KEY_CURSOR_PREFIX):
+        raise InvalidCursorError("Malformed cursor")
+    return raw[len(_KEY_CURSOR_PREFIX):]
+
+
+def paginate_by_key(
+    fetch: Callable[[Optional[str], Optional[int]], Iterable[T]],
+    key: Callable[[T], str],
+    cursor: Optional[str],
+    limit: Optional[int],
+) -> KeysetPage:
+    """Resuelve la pagina pedida sobre un resultado ordenado por una clave unica.
+
+    `fetch(after, limit)` devuelve hasta `limit` filas con clave mayor a `after` (todas
+    si `after` es None), asi que cada pagina cuesta lo mismo sin importar cuanto se
+    avanzo. El cursor no depende de la version de los datos: despues de una recarga
+    se sigue desde la misma clave, con los cambios ya aplicados. Sin `limit` se
+    devuelve todo lo que queda desde el cursor, sin materializarlo.
+    """
+    after = None if cursor is None else decode_key_cursor(cursor)
+    if limit is None:
+        return KeysetPage(fetch(after, None), None)
+    # Una fila de mas para saber si hay otra pagina
+    rows = list(fetch(after, limit + 1))
+    next_cursor = encode_key_cursor(key(rows[limit - 1])) if len(rows) > limit else None
+    return KeysetPage(rows[:limit], next_cursor)
@@ -0,0 +1,43 @@
+from typing import Any, Callable, Dict, Iterable, Optional, TypeVar
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+from .caching import ETAG_HEADER, IF_NONE_MATCH_HEADER, cache_headers, entity_tag, etag_matches
+from .encoding import NDJSON_MEDIA_TYPE, iter_ndjson, json_bytes
+
+T = TypeVar("T")
+
+
+def json_response(content: Any, headers: Optional[dict] = None) -> Response:
+    """Respuesta JSON ya serializada.
+
+    FastAPI no vuelve a validar contra `response_model` cuando el endpoint devuelve un
+    Response, asi que el modelo declarado en el decorador solo documenta el schema.
+    """
+    return Response(content=json_bytes(content), media_type="application/json", headers=headers)
+
+
+def ndjson_response(
+    items: Iterable[T], to_dict: Callable[[T], dict], headers: Optional[dict] = None
+) -> StreamingResponse:
+    return StreamingResponse(
+        iter_ndjson(items, to_dict), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+
+def conditional_headers(request: Request, revision: str, max_age: int) -> Dict[str, str]:
+    """ETag (revision de los datos + query del request) y Cache-Control para un GET.
+
+    Hay que llamarla antes de tomar el snapshot que se va a responder: si hay una
+    recarga en el medio, el ETag queda con la revision anterior (el cliente revalida
+    y recibe un 200) y nunca con una revision mas nueva que el cuerpo.
+    """
+    etag = entity_tag(revision, request.url.path, request.query_params.multi_items())
+    return cache_headers(etag, max_age)
+
+
+def not_modified_response(request: Request, headers: Dict[str, str]) -> Optional[Response]:
+    """304 si el cliente ya tiene esta version de la respuesta; None si hay que generarla."""
+    if etag_matches(request.headers.get(IF_NONE_MATCH_HEADER), headers[ETAG_HEADER]):
+        return Response(status_code=304, headers=headers)
+    return None
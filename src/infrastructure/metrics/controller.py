@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Response
+
+from .registry import REGISTRY
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_MEDIA_TYPE)
@@ -0,0 +1,60 @@
+from time import perf_counter
+
+from .profiling import current_profile, end_profile, start_profile
+from .registry import REGISTRY
+
+PROFILE_HEADER = "X-Search-Profile"
+
+_PROFILE_HEADER_KEY = PROFILE_HEADER.lower().encode()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Latencia de los requests HTTP por ruta y status",
+    labelnames=("method", "route", "status"),
+)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que mide la latencia de cada request por ruta.
+
+    Si el request trae el header X-Search-Profile (y `profile_header` esta habilitado)
+    se activa el perfil por etapa y la respuesta lo devuelve en el mismo header. En
+    respuestas streaming el header sale antes del body, asi que no incluye la
+    serializacion de lo que se envia despues.
+    """
+
+    def __init__(self, app, profile_header: bool = True):
+        self.app = app
+        self.profile_header = profile_header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        status = 500
+        token = profile = None
+        if self.profile_header and any(k == _PROFILE_HEADER_KEY for k, _ in scope["headers"]):
+            token = start_profile()
+            profile = current_profile()
+
+        async def send_with_profile(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profile is not None:
+                    headers = [*message.get("headers", ()),
+                               (_PROFILE_HEADER_KEY, profile.header().encode())]
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            # El template de la ruta (no el path) para no abrir una serie por ciudad
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.observe(
+                perf_counter() - start, (scope["method"], route, str(status)))
+            if token is not None:
+                end_profile(token)
@@ -0,0 +1,72 @@
+from contextvars import ContextVar, Token
+from time import perf_counter
+from typing import Dict, Optional
+
+from .registry import REGISTRY, Counter
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "search_stage_duration_seconds",
+    "Duracion de cada etapa de la carga y la busqueda",
+    labelnames=("stage",),
+)
+
+
+class RequestProfile:
+    """Desglose por etapa de un request, para el header X-Search-Profile."""
+
+    __slots__ = ("stages", "counts")
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, float] = {}
+
+    def header(self) -> str:
+        # Las etapas que se repiten (una por destino, por ejemplo) se suman
+        parts = [f"{name}={seconds * 1000:.3f}ms" for name, seconds in self.stages.items()]
+        parts += [f"{name}={value:g}" for name, value in self.counts.items()]
+        return ", ".join(parts)
+
+
+# Solo hay un perfil activo si el request lo pidio: sin el, cada etapa cuesta dos
+# perf_counter y un observe en el histograma
+_profile: ContextVar[Optional[RequestProfile]] = ContextVar("search_profile", default=None)
+
+
+def start_profile() -> Token:
+    return _profile.set(RequestProfile())
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _profile.get()
+
+
+def end_profile(token: Token) -> None:
+    _profile.reset(token)
+
+
+class stage:
+    """Mide un bloque: `with stage("scan"): ...`."""
+
+    __slots__ = ("_name", "_start")
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __enter__(self) -> "stage":
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        elapsed = perf_counter() - self._start
+        STAGE_SECONDS.labels(self._name).observe(elapsed)
+        profile = _profile.get()
+        if profile is not None:
+            profile.stages[self._name] = profile.stages.get(self._name, 0.0) + elapsed
+
+
+def count(counter: Counter, amount: float) -> None:
+    """Incrementa un contador y, si hay un perfil activo, lo suma a su desglose."""
+    counter.inc(amount)
+    profile = _profile.get()
+    if profile is not None:
+        profile.counts[counter.name] = profile.counts.get(counter.name, 0) + amount
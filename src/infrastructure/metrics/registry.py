@@ -0,0 +1,158 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+Labels = Tuple[str, ...]
+
+# Buckets de latencia en segundos: desde 100us (un tramo de una busqueda) hasta 10s
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}"
+
+
+class Counter:
+    """Contador monotono, opcionalmente con labels (una serie por combinacion de valores)."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, labels: Labels = ()) -> None:
+        # Sin lock, por el mismo motivo que HistogramSeries.observe
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> List[str]:
+        values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {value:g}"
+            for labels, value in values
+        ]
+
+
+class HistogramSeries:
+    """Una serie de un histograma (una combinacion de valores de labels)."""
+
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # Conteo por bucket, no acumulado; el ultimo es +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        # Sin lock: se llama varias veces por busqueda y un lock costaria tanto como el
+        # resto de la medicion. Bajo el GIL una observacion concurrente puede perderse
+        # muy de vez en cuando, algo aceptable para una metrica.
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Histogram:
+    """Histograma con buckets fijos, en el formato acumulativo de Prometheus."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Labels, HistogramSeries] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> HistogramSeries:
+        """Serie de esos labels; conviene guardarla en los caminos calientes."""
+        series = self._series.get(values)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(values, HistogramSeries(self.buckets))
+        return series
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        self.labels(*labels).observe(value)
+
+    def count(self, labels: Labels = ()) -> int:
+        series = self._series.get(labels)
+        return 0 if series is None else sum(series.counts)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = sorted(self._series.items())
+
+        lines = []
+        names = (*self.labelnames, "le")
+        bounds = (*map("{:g}".format, self.buckets), "+Inf")
+        for labels, s in series:
+            counts, total = list(s.counts), s.sum
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(names, (*labels, bound))} {cumulative}")
+            suffix = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{suffix} {total:g}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metricas del proceso, expuestas en formato de texto de Prometheus (/metrics)."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Registro global del proceso (cada worker de uvicorn expone el suyo)
+REGISTRY = MetricsRegistry()